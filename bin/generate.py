@@ -1,5 +1,7 @@
 import argparse
+from datetime import timedelta
 from midjourney.core.main import ImageGenerator
+from midjourney.core.scheduler import BatchScheduler
 
 
 def main():
@@ -17,9 +19,51 @@ def main():
     parser.add_argument('--desc', '-t',
                         type=str,
                         help="Description for prompt generation via OpenAI")
+    parser.add_argument('--split-grid',
+                        action='store_true',
+                        default=None,
+                        help="Split the grid locally instead of upscaling on Discord")
+
+    parser.add_argument('--no-dedupe',
+                        action='store_true',
+                        help="Enqueue even if an identical job is already queued or running")
+    parser.add_argument('--pack',
+                        action='store_true',
+                        help="Send the all-categories batch as permutation prompts")
+    parser.add_argument('--trace',
+                        type=str,
+                        help="Write a Chrome/Perfetto trace of each job to this file")
+    parser.add_argument('--schedule', '-s',
+                        type=str,
+                        help="Comma-separated run times (HH:MM or Dawn, Morning, "
+                             "Noon, Afternoon, Dusk, Night) for scheduler mode")
+    parser.add_argument('--lookahead',
+                        type=int,
+                        default=30,
+                        help="Minutes before each scheduled run to pre-generate prompts")
 
     args = parser.parse_args()
 
+    if args.schedule:
+        print("⏰ Scheduler Mode")
+        print(f"➡ Run times: {args.schedule}")
+        print(f"➡ Category: {args.category or 'all'}")
+        generator = ImageGenerator(split_grid=args.split_grid,
+                                   trace_file=args.trace)
+        scheduler = BatchScheduler(
+            generator,
+            run_times=args.schedule.split(","),
+            lookahead=timedelta(minutes=args.lookahead),
+            category=args.category,
+            dedupe=not args.no_dedupe,
+            pack=args.pack,
+        )
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            scheduler.stop()
+        return
+
     # Determine mode of operation
     if args.prompt:
         print("📝 Custom Prompt Mode")
@@ -36,18 +80,27 @@ def main():
         print(f"➡ Date: {args.date or 'today'}")
         print("➡ Category: None")
 
-    generator = ImageGenerator()
+    generator = ImageGenerator(split_grid=args.split_grid,
+                               trace_file=args.trace)
 
     # Push message to background queue
-    generator.message_push(
+    jobs = generator.message_push(
         date=args.date,
         category=args.category,
         user_prompt=args.prompt,
-        description=args.desc
+        description=args.desc,
+        dedupe=not args.no_dedupe,
+        pack=args.pack
     )
 
-    # Wait for the message queue to process all prompts
+    # Stream results as each job finishes
     print("🕒 Waiting for prompts to be sent...")
+    for job in generator.as_completed(jobs):
+        error = job.exception()
+        if error:
+            print(f"❌ Job {job.job_id} failed: {error}")
+        else:
+            print(f"🖼️ Job {job.job_id} done: {job.result()['result_img_url']}")
     generator.message_queue.join()
     print("✅ All prompts processed successfully.")
 
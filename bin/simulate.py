@@ -0,0 +1,66 @@
+import argparse
+import json
+import logging
+from midjourney.core.simulation import run_simulation
+
+
+def main():
+    parser = argparse.ArgumentParser(
+            description="Simulate the Midjourney pipeline on a virtual clock")
+    parser.add_argument('--jobs', '-n',
+                        type=int,
+                        default=100,
+                        help="Number of jobs to simulate")
+    parser.add_argument('--channels',
+                        type=int,
+                        default=2,
+                        help="Number of simulated Discord channels")
+    parser.add_argument('--workers',
+                        type=int,
+                        default=2,
+                        help="Number of worker threads")
+    parser.add_argument('--seed',
+                        type=int,
+                        default=0,
+                        help="Random seed for render times and failures")
+    parser.add_argument('--poll-interval',
+                        type=float,
+                        default=30,
+                        help="Seconds between Discord polls")
+    parser.add_argument('--failure-rate',
+                        type=float,
+                        default=0.02,
+                        help="Failure probability of each simulated interaction")
+    parser.add_argument('--pack',
+                        action='store_true',
+                        help="Push all-categories batches as permutation prompts")
+    parser.add_argument('--log-level',
+                        type=str,
+                        default="CRITICAL",
+                        help="Log level for the simulated bot (e.g. INFO, ERROR)")
+
+    args = parser.parse_args()
+
+    rate = args.failure_rate
+    report = run_simulation(
+        num_jobs=args.jobs,
+        num_channels=args.channels,
+        num_workers=args.workers,
+        seed=args.seed,
+        poll_interval=args.poll_interval,
+        engine_options={
+            "send_failure_rate": rate,
+            "grid_lost_rate": rate,
+            "click_failure_rate": rate,
+            "upscale_lost_rate": rate,
+            "download_failure_rate": rate,
+        },
+        prompt_options={"failure_rate": rate},
+        pack=args.pack,
+        log_level=getattr(logging, args.log_level.upper()),
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
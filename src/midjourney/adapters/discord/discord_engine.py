@@ -1,11 +1,97 @@
 import os
-import uuid
+import re
 import time
+import uuid
 import requests
 import logging
+from contextlib import contextmanager
 from typing import Optional
 from urllib.parse import urlparse
 
+from midjourney.utils.tracing.tracer import Tracer
+from midjourney.utils.clock.clock import Clock, SystemClock
+
+# Pipeline stages in order; a checkpoint records the last completed one
+STAGES = ("send", "grid", "upscale_click", "upscale", "download")
+
+
+class DiscordRateLimited(Exception):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Strip surrounding whitespace, quotes and a trailing period, the way
+    prompts are cleaned up before being sent to Midjourney.
+    """
+    return prompt.strip().strip('""').rstrip('.')
+
+
+def prompt_matches(content: str, prompt: str) -> bool:
+    """
+    Whether a Midjourney message's content was generated from `prompt`,
+    ignoring case, punctuation and escaping.
+    """
+    def squash(text: str) -> str:
+        return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+    needle = squash(prompt)[:120]
+    return bool(needle) and needle in squash(content)
+
+
+# Discord snowflakes count milliseconds from 2015-01-01 in their top bits
+DISCORD_EPOCH_MS = 1420070400000
+
+
+def snowflake_at(timestamp: float) -> int:
+    """
+    The smallest Discord message id that can be created at `timestamp`
+    (Unix seconds), usable as a "created after" bound.
+    """
+    return (int(timestamp * 1000) - DISCORD_EPOCH_MS) << 22
+
+
+def message_is_newer(msg: dict, after_id: Optional[int]) -> bool:
+    """
+    Whether `msg` was created after the snowflake `after_id`. Messages
+    without a numeric id (the simulated channel) always count as newer.
+    """
+    if not after_id:
+        return True
+    try:
+        return int(msg.get("id")) > after_id
+    except (TypeError, ValueError):
+        return True
+
+
+def prompt_match_text(prompt: str) -> str:
+    """
+    The part of `prompt` that Midjourney echoes back verbatim: its text
+    without parameters or image URLs (which Midjourney shortens).
+    """
+    text = re.split(r"(?:^|\s)--[a-zA-Z]", normalize_prompt(prompt), maxsplit=1)[0]
+    return re.sub(r"<?https?://\S+", " ", text).strip().rstrip(",.")
+
+
+class StageFailed(Exception):
+    def __init__(self, stage: str, cause: Exception):
+        super().__init__(f"Stage '{stage}' failed: {cause}")
+        self.stage = stage
+        self.retry_after = getattr(cause, "retry_after", None)
+
+
+def _raise_if_rate_limited(response):
+    if response.status_code == 429:
+        try:
+            retry_after = float(response.json().get("retry_after", 0))
+        except Exception:
+            retry_after = None
+        raise DiscordRateLimited(
+            f"Rate limited by Discord: {response.text}", retry_after
+        )
+
 
 class DiscordEngine:
     def __init__(
@@ -18,6 +104,13 @@ class DiscordEngine:
         command_id: str,
         session_id: Optional[str] = "Cannot be empty",
         logger: Optional[logging.Logger] = None,
+        split_grid: bool = False,
+        tracer: Optional[Tracer] = None,
+        clock: Optional[Clock] = None,
+        poll_interval: float = 30,
+        use_threads: bool = False,
+        thread_cleanup: str = "archive",
+        base_url: str = "https://discord.com/api/v9",
     ):
         self.token = discord_token
         self.application_id = application_id
@@ -27,50 +120,206 @@ class DiscordEngine:
         self.command_id = command_id
         self.session_id = session_id
         self.logger = logger or logging.getLogger("discord_engine")
-        self.base_url = "https://discord.com/api/v9"
+        self.base_url = base_url.rstrip("/")
         self.headers = {
             "Authorization": self.token,
             "Content-Type": "application/json",
         }
         self.image_path_str = ""
+        # When set, the grid itself is downloaded and split locally
+        # instead of asking Midjourney for an upscale.
+        self.split_grid = split_grid
+        self.tracer = tracer or Tracer()
+        self.clock = clock or SystemClock()
+        self.poll_interval = poll_interval
+        # When set, each job (or pack) runs in its own thread of the
+        # channel, so polls only read that job's few messages.
+        # thread_cleanup is "archive", "delete" or "none".
+        self.use_threads = use_threads
+        self.thread_cleanup = thread_cleanup
+        self._active_channel_id = channel_id
+
+    def generate_image(self, prompt: str,
+                       checkpoint: Optional[dict] = None) -> str:
+        """
+        Run the imagine -> grid -> upscale -> download pipeline and return
+        the local image path.
+
+        `checkpoint` is updated in place as stages complete (grid message
+        id, custom_id, upscale URL, ...). Passing the same dict back after
+        a `StageFailed` resumes from the last completed stage instead of
+        sending a new /imagine.
+        """
+        checkpoint = {} if checkpoint is None else checkpoint
+        if checkpoint.get("stage"):
+            self.logger.info(
+                f"♻️ [RESUME] Resuming after stage '{checkpoint['stage']}'"
+            )
+        self._active_channel_id = checkpoint.get("thread_id") or self.channel_id
+
+        if not self._reached(checkpoint, "send"):
+            self.logger.info("🔧 [INIT] Sending prompt to Midjourney...")
+            with self._stage("send"):
+                self._open_job_thread(checkpoint)
+                # Only messages created after this send can be this job's
+                checkpoint["after_id"] = snowflake_at(time.time())
+                self._send_prompt(prompt)
+            checkpoint["stage"] = "send"
+
+        if not self._reached(checkpoint, "grid"):
+            self.logger.info("📩 [FETCH] Waiting for grid image...")
+            # Other jobs' grids share the channel unless each has a thread
+            match = prompt_match_text(prompt)
+            with self._stage("grid"):
+                message_id, custom_id, grid_url = self._wait_for_grid_and_get_button(
+                    match, checkpoint.get("after_id")
+                )
+                if not message_id or not custom_id:
+                    raise RuntimeError("Failed to receive grid or upscale buttons.")
+            checkpoint.update(stage="grid", message_id=message_id,
+                              custom_id=custom_id, grid_url=grid_url, match=match)
 
-    def generate_image(self, prompt: str) -> Optional[str]:
-        self.logger.info("🔧 [INIT] Sending prompt to Midjourney...")
-        self._send_prompt(prompt)
+        if self.split_grid:
+            if not self._reached(checkpoint, "download"):
+                with self._stage("download"):
+                    grid_url = checkpoint.get("grid_url")
+                    if not grid_url:
+                        raise RuntimeError("Grid message has no attachment.")
+                    self.logger.info(f"📥[DOWNLOAD] Saving grid from URL: {grid_url}")
+                    self._download_image(grid_url)
+                checkpoint.update(stage="download", image_path=self.image_path_str)
+            return checkpoint["image_path"]
 
-        self.logger.info("📩 [FETCH] Waiting for grid image...")
-        message_id, custom_id = self._wait_for_grid_and_get_button()
-        if not message_id or not custom_id:
-            self.logger.error(
-                    "❌ [ERROR] Failed to receive grid or upscale buttons."
-                    )
-            return None
+        if not self._reached(checkpoint, "upscale_click"):
+            self.logger.info(
+                    f"✅ [BUTTON] Triggering upscale with custom_id: {checkpoint['custom_id']}"
+                )
+            with self._stage("upscale_click"):
+                checkpoint["upscale_after_id"] = snowflake_at(time.time())
+                self._send_component_interaction(
+                    checkpoint["custom_id"], checkpoint["message_id"]
+                )
+            checkpoint["stage"] = "upscale_click"
 
-        self.logger.info(
-                f"✅ [BUTTON] Triggering upscale with custom_id: {custom_id}"
+        if not self._reached(checkpoint, "upscale"):
+            self.logger.info("🖼️ [WAIT] Waiting for upscaled image...")
+            with self._stage("upscale"):
+                final_image_url = self._wait_for_upscale_image(
+                    checkpoint.get("match"), checkpoint.get("upscale_after_id")
+                )
+                if not final_image_url:
+                    raise RuntimeError("Failed to receive upscaled image.")
+            checkpoint.update(stage="upscale", upscale_url=final_image_url)
+
+        if not self._reached(checkpoint, "download"):
+            final_image_url = checkpoint["upscale_url"]
+            self.logger.info(f"📥[DOWNLOAD] Saving img from URL: {final_image_url}")
+            with self._stage("download"):
+                self._download_image(final_image_url)
+            checkpoint.update(stage="download", image_path=self.image_path_str)
+        return checkpoint["image_path"]
+
+    def imagine_pack(self, prompt: str, sub_prompts: list[str],
+                     checkpoint: Optional[dict] = None) -> list[Optional[dict]]:
+        """
+        Send one permutation prompt that Midjourney expands into one job
+        per entry of `sub_prompts`, and wait for their grids.
+
+        Returns, per sub-prompt, a checkpoint positioned after the grid
+        stage (or None if its grid never appeared); passing it to
+        `generate_image` finishes that sub-job.
+        """
+        checkpoint = {} if checkpoint is None else checkpoint
+        self._active_channel_id = checkpoint.get("thread_id") or self.channel_id
+        if not self._reached(checkpoint, "send"):
+            self.logger.info(
+                f"🔧 [INIT] Sending permutation prompt for {len(sub_prompts)} jobs..."
             )
-        self._send_component_interaction(custom_id, message_id)
+            with self._stage("send"):
+                self._open_job_thread(checkpoint)
+                # Only messages created after this send can be this job's
+                checkpoint["after_id"] = snowflake_at(time.time())
+                self._send_prompt(prompt)
+            checkpoint["stage"] = "send"
+
+        if not self._reached(checkpoint, "grid"):
+            self.logger.info("📩 [FETCH] Waiting for permutation grids...")
+            with self._stage("grid"):
+                grids = self._wait_for_pack_grids(sub_prompts, checkpoint.get("after_id"))
+                if not any(grids):
+                    raise RuntimeError("No grids received for permutation prompt.")
+                for grid in filter(None, grids):
+                    grid["after_id"] = checkpoint.get("after_id")
+                    if checkpoint.get("thread_id"):
+                        grid["thread_id"] = checkpoint["thread_id"]
+            checkpoint.update(stage="grid", grids=grids)
+        return checkpoint["grids"]
+
+    def _open_job_thread(self, checkpoint: dict):
+        if not self.use_threads or checkpoint.get("thread_id"):
+            return
+        url = f"{self.base_url}/channels/{self.channel_id}/threads"
+        payload = {
+            "name": f"mj-{uuid.uuid4().hex[:8]}",
+            "type": 11,  # public thread
+            "auto_archive_duration": 60,
+        }
+        response = requests.post(url, headers=self.headers, json=payload)
+        _raise_if_rate_limited(response)
+        if response.status_code not in (200, 201):
+            raise Exception(f"Failed to create thread: {response.status_code} - {response.text}")
+        checkpoint["thread_id"] = response.json()["id"]
+        self._active_channel_id = checkpoint["thread_id"]
+        self.logger.info(f"🧵 [THREAD] Opened job thread {checkpoint['thread_id']}")
 
-        self.logger.info("🖼️ [WAIT] Waiting for upscaled image...")
-        final_image_url = self._wait_for_upscale_image()
-        if not final_image_url:
-            self.logger.error("❌ [ERROR] Failed to receive upscaled image.")
-            return None
+    def close_job_thread(self, checkpoint: dict):
+        """
+        Archive or delete the job's thread, if one was opened. Safe to
+        call more than once; failures are logged, not raised.
+        """
+        thread_id = checkpoint.pop("thread_id", None)
+        self._active_channel_id = self.channel_id
+        if not thread_id or self.thread_cleanup == "none":
+            return
+        url = f"{self.base_url}/channels/{thread_id}"
+        try:
+            if self.thread_cleanup == "delete":
+                response = requests.delete(url, headers=self.headers)
+            else:
+                response = requests.patch(url, headers=self.headers,
+                                          json={"archived": True, "locked": True})
+            if response.status_code not in (200, 204):
+                raise Exception(f"{response.status_code} - {response.text}")
+            self.logger.info(f"🧹 [THREAD] Closed job thread {thread_id}")
+        except Exception as e:
+            self.logger.error(f"❌ [ERROR] Failed to close thread {thread_id}: {e}")
 
-        self.logger.info(f"📥[DOWNLOAD] Saving img from URL: {final_image_url}")
-        self._download_image(final_image_url)
-        return self.image_path_str
+    @staticmethod
+    def _reached(checkpoint: dict, stage: str) -> bool:
+        done = checkpoint.get("stage")
+        return done is not None and STAGES.index(done) >= STAGES.index(stage)
+
+    @contextmanager
+    def _stage(self, stage: str):
+        try:
+            with self.tracer.span(stage, channel_id=self._active_channel_id):
+                yield
+        except StageFailed:
+            raise
+        except Exception as e:
+            self.logger.error(f"❌ [ERROR] Stage '{stage}' failed: {e}")
+            raise StageFailed(stage, e) from e
 
     def _send_prompt(self, prompt: str):
         self.logger.info(f"📤 [SEND] Sending prompt: `{prompt}`")
-        prompt = prompt.strip().strip('""').rstrip('.')
+        prompt = normalize_prompt(prompt)
         #url = self.base_url + "/interaction"
         url = f"{self.base_url}/interactions"
         payload = {
                 "type": 2,
                 "application_id": self.application_id,
                 "guild_id": self.guild_id,
-                "channel_id": self.channel_id,
+                "channel_id": self._active_channel_id,
                 "session_id": self.session_id,
                 "data": {
                     "version": self.version,
@@ -102,37 +351,61 @@ class DiscordEngine:
                     },
                 }
         response = requests.post(url, headers=self.headers, json=payload)
+        _raise_if_rate_limited(response)
         if response.status_code != 204:
             raise Exception(f"Failed to send prompt: {response.status_code} - {response.text}")
         self.logger.info("📤 [SENT] Prompt successfully sent.")
 
-    def _wait_for_grid_and_get_button(self) -> tuple[Optional[str], Optional[str]]:
+    def _wait_for_grid_and_get_button(
+        self, match: Optional[str] = None, after_id: Optional[int] = None,
+    ) -> tuple[Optional[str], Optional[str], Optional[str]]:
         for attempt in range(6):
-            time.sleep(30)
+            self.clock.sleep(self.poll_interval)
             self.logger.info(f"⏳ [WAIT] Attempt {attempt + 1}/6: Looking for grid...")
-            try:
-                messages = self._get_messages()
-                for msg in messages:
-                    message_id = msg.get("id")
-                    components_outer = msg.get("components", [])
-                    if not components_outer:
-                        continue
-                    components = components_outer[0].get("components", [])
-                    buttons = [c for c in components if c.get("label") in ["U1", "U2", "U3", "U4"]]
-                    if buttons:
-                        custom_id = buttons[0]["custom_id"]
-                        self.logger.info(f"🔘 [FOUND] Button {buttons[0]['label']} - {custom_id}")
-                        return message_id, custom_id
-            except Exception as e:
-                self.logger.error(f"❌ [ERROR] Failed to parse grid message: {e}")
-        return None, None
+            for msg in self._poll_messages("poll_grid", attempt + 1, after_id):
+                if match and not prompt_matches(msg.get("content", ""), match):
+                    continue
+                custom_id = self._upscale_custom_id(msg)
+                if custom_id:
+                    self.logger.info(f"🔘 [FOUND] Upscale button - {custom_id}")
+                    return msg.get("id"), custom_id, self._first_attachment(msg)
+        return None, None, None
+
+    def _wait_for_pack_grids(self, sub_prompts: list[str],
+                             after_id: Optional[int] = None) -> list[Optional[dict]]:
+        grids: list[Optional[dict]] = [None] * len(sub_prompts)
+        # Midjourney runs only a few jobs at once, so allow more polls
+        attempts = 6 + 2 * (len(sub_prompts) - 1)
+        for attempt in range(attempts):
+            self.clock.sleep(self.poll_interval)
+            self.logger.info(
+                f"⏳ [WAIT] Attempt {attempt + 1}/{attempts}: "
+                f"{sum(g is not None for g in grids)}/{len(grids)} grids found..."
+            )
+            for msg in self._poll_messages("poll_grid", attempt + 1, after_id):
+                custom_id = self._upscale_custom_id(msg)
+                if not custom_id:
+                    continue
+                for index, sub_prompt in enumerate(sub_prompts):
+                    if grids[index] is None and prompt_matches(msg.get("content", ""), sub_prompt):
+                        grids[index] = {
+                            "stage": "grid",
+                            "message_id": msg.get("id"),
+                            "custom_id": custom_id,
+                            "grid_url": self._first_attachment(msg),
+                            "match": sub_prompt,
+                        }
+                        break
+            if all(grids):
+                break
+        return grids
 
     def _send_component_interaction(self, custom_id: str, message_id: str):
         url = f"{self.base_url}/interactions"
         payload = {
             "type": 3,
             "guild_id": self.guild_id,
-            "channel_id": self.channel_id,
+            "channel_id": self._active_channel_id,
             "message_id": message_id,
             "application_id": self.application_id,
             "session_id": self.session_id,
@@ -144,27 +417,65 @@ class DiscordEngine:
         }
 
         response = requests.post(url, headers=self.headers, json=payload)
+        _raise_if_rate_limited(response)
         if response.status_code != 204:
             raise Exception(f"Button click failed: {response.status_code} - {response.text}")
         self.logger.info(f"📩 [CLICKED] Sent component interaction.")
 
-    def _wait_for_upscale_image(self) -> Optional[str]:
+    def _wait_for_upscale_image(self, match: Optional[str] = None,
+                                after_id: Optional[int] = None) -> Optional[str]:
         for attempt in range(6):
-            time.sleep(30)
+            self.clock.sleep(self.poll_interval)
             self.logger.info(f"📥 [FETCH] Attempt {attempt + 1}/6: Checking for final image...")
-            try:
+            for msg in self._poll_messages("poll_upscale", attempt + 1, after_id):
+                # Grid messages also carry a single attachment; skip them
+                if self._upscale_custom_id(msg):
+                    continue
+                if match and not prompt_matches(msg.get("content", ""), match):
+                    continue
+                if len(msg.get("attachments", [])) == 1:
+                    return self._first_attachment(msg)
+        return None
+
+    def _poll_messages(self, span: str, attempt: int,
+                       after_id: Optional[int] = None) -> list[dict]:
+        """
+        One poll of the active channel, keeping only messages created
+        after `after_id` so an earlier job's identical prompt is never
+        picked up. Rate limits are raised so the stage retry logic and the
+        channel's health see them; other errors are logged and yield no
+        messages, so the caller polls again.
+        """
+        try:
+            with self.tracer.span(span, attempt=attempt):
                 messages = self._get_messages()
-                for msg in messages:
-                    attachments = msg.get("attachments", [])
-                    if len(attachments) == 1:
-                        return attachments[0].get("url")
-            except Exception as e:
-                self.logger.error(f"❌ [ERROR] Failed to fetch upscaled image: {e}")
+            return [m for m in messages if message_is_newer(m, after_id)]
+        except DiscordRateLimited:
+            raise
+        except Exception as e:
+            self.logger.error(f"❌ [ERROR] Failed to fetch messages: {e}")
+            return []
+
+    @staticmethod
+    def _upscale_custom_id(msg: dict) -> Optional[str]:
+        # custom_id of a grid message's first U1-U4 button, None otherwise
+        for row in msg.get("components", []):
+            for component in row.get("components", []):
+                if component.get("label") in ("U1", "U2", "U3", "U4"):
+                    return component.get("custom_id")
         return None
 
+    @staticmethod
+    def _first_attachment(msg: dict) -> Optional[str]:
+        attachments = msg.get("attachments", [])
+        return attachments[0].get("url") if attachments else None
+
     def _get_messages(self):
-        url = f"{self.base_url}/channels/{self.channel_id}/messages?limit=50"
+        # A job thread only holds that job's messages
+        limit = 10 if self._active_channel_id != self.channel_id else 50
+        url = f"{self.base_url}/channels/{self._active_channel_id}/messages?limit={limit}"
         response = requests.get(url, headers=self.headers)
+        _raise_if_rate_limited(response)
         response.raise_for_status()
         return response.json()
 
@@ -180,3 +491,4 @@ class DiscordEngine:
             self.logger.info(f"✅ [DOWNLOADED] Image saved to {self.image_path_str}")
         else:
             self.logger.error(f"❌ [ERROR] Failed to download image: {response.status_code}")
+            raise Exception(f"Failed to download image: {response.status_code}")
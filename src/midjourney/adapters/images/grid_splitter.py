@@ -0,0 +1,32 @@
+# Standard Library Imports
+import os
+from typing import Optional
+
+
+def split_grid(grid_path: str, output_dir: Optional[str] = None) -> list[str]:
+    """
+    Split a Midjourney 2x2 grid image into its four quadrants, in U1..U4
+    order (top-left, top-right, bottom-left, bottom-right).
+    Returns the paths of the saved quadrant images.
+    """
+    from PIL import Image
+
+    output_dir = output_dir or os.path.dirname(grid_path) or "."
+    os.makedirs(output_dir, exist_ok=True)
+    stem, ext = os.path.splitext(os.path.basename(grid_path))
+
+    paths = []
+    with Image.open(grid_path) as grid:
+        width, height = grid.size
+        half_w, half_h = width // 2, height // 2
+        boxes = [
+            (0, 0, half_w, half_h),
+            (half_w, 0, width, half_h),
+            (0, half_h, half_w, height),
+            (half_w, half_h, width, height),
+        ]
+        for index, box in enumerate(boxes, start=1):
+            path = os.path.join(output_dir, f"{stem}_U{index}{ext or '.png'}")
+            grid.crop(box).save(path)
+            paths.append(path)
+    return paths
@@ -0,0 +1,132 @@
+# Standard Library Imports
+import os
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+# Internal Project Imports
+from midjourney.utils.logger.logger import Logger
+
+FORMAT_EXTENSIONS = {
+    "webp": "webp",
+    "jpeg": "jpg",
+    "jpg": "jpg",
+    "png": "png",
+}
+
+
+def parse_variants(spec: str) -> list[dict]:
+    """
+    Parse a derivative spec such as
+    "thumb:270x480:webp,phone:1080x1920:jpeg:85" into variant dicts.
+    Each entry is name:WIDTHxHEIGHT:format[:quality].
+    """
+    variants = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        fields = entry.split(":")
+        if len(fields) not in (3, 4):
+            raise ValueError(f"Invalid post-process variant: {entry!r}")
+        name, size, fmt = fields[:3]
+        fmt = fmt.lower()
+        if fmt not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported post-process format: {fmt!r}")
+        width, height = (int(v) for v in size.lower().split("x"))
+        variants.append({
+            "name": name,
+            "width": width,
+            "height": height,
+            "format": fmt,
+            "quality": int(fields[3]) if len(fields) == 4 else 85,
+        })
+    return variants
+
+
+def render_variants(image_path: str, variants: list[dict],
+                    output_dir: str) -> list[dict]:
+    """
+    Center-crop each variant to its aspect ratio, resize and save it.
+    Runs inside a worker process, so it must stay a top-level function.
+    """
+    from PIL import Image
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    derivatives = []
+    with Image.open(image_path) as source:
+        source = source.convert("RGB")
+        src_w, src_h = source.size
+        for variant in variants:
+            target_ratio = variant["width"] / variant["height"]
+            if src_w / src_h > target_ratio:
+                crop_w, crop_h = round(src_h * target_ratio), src_h
+            else:
+                crop_w, crop_h = src_w, round(src_w / target_ratio)
+            left = (src_w - crop_w) // 2
+            top = (src_h - crop_h) // 2
+            image = source.crop((left, top, left + crop_w, top + crop_h))
+            image = image.resize((variant["width"], variant["height"]),
+                                 Image.LANCZOS)
+
+            ext = FORMAT_EXTENSIONS[variant["format"]]
+            path = os.path.join(output_dir, f"{stem}_{variant['name']}.{ext}")
+            image.save(path, format="JPEG" if ext == "jpg" else ext.upper(),
+                       quality=variant["quality"])
+            derivatives.append({
+                "name": variant["name"],
+                "path": path,
+                "width": variant["width"],
+                "height": variant["height"],
+                "format": variant["format"],
+            })
+    return derivatives
+
+
+def render_all(image_paths: list[str], variants: list[dict],
+               output_dir: str) -> list[dict]:
+    derivatives = []
+    for image_path in image_paths:
+        for derivative in render_variants(image_path, variants, output_dir):
+            derivative["source"] = image_path
+            derivatives.append(derivative)
+    return derivatives
+
+
+class ImagePostProcessor:
+    """
+    Produces resized/cropped derivatives of downloaded images in a process
+    pool, so the CPU-bound work overlaps with the network-bound Discord
+    work done by the worker threads.
+    """
+
+    def __init__(self, variants: list[dict],
+                 output_dir: str = os.path.join("images", "derivatives"),
+                 max_workers: Optional[int] = None,
+                 logger: Optional[Logger] = None) -> None:
+        try:
+            import PIL  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError(
+                "Image post-processing requires Pillow (pip install pillow)"
+            ) from e
+        if not variants:
+            raise ValueError("At least one post-process variant is required")
+
+        self.variants = variants
+        self.output_dir = output_dir
+        self.logger = logger
+        # Jobs are submitted from worker threads; forking a multi-threaded
+        # process can deadlock the child, so start fresh interpreters.
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def submit(self, image_paths: list[str]) -> Future:
+        if self.logger:
+            self.logger.info(f"🎨 [POST] Queued derivatives for {image_paths}")
+        return self.executor.submit(
+            render_all, image_paths, self.variants, self.output_dir
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait)
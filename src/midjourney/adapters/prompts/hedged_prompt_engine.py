@@ -0,0 +1,64 @@
+# Standard Library Imports
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional
+
+# Internal Project Imports
+from midjourney.utils.logger.logger import Logger
+from midjourney.domain.i_prompt_engine import PromptEngine
+
+FAILURE_PREFIX = "Prompt generation failed"
+
+
+class HedgedPromptEngine(PromptEngine):
+    """
+    Calls the primary engine with a latency budget and falls back to a
+    second engine when the primary is too slow, raises, or returns one
+    of OpenAIPromptEngine's "Prompt generation failed" strings.
+    A primary call that overruns keeps running in the background; its
+    result is discarded.
+    """
+
+    def __init__(self, primary: PromptEngine, fallback: PromptEngine,
+                 latency_budget: float = 20.0,
+                 logger: Optional[Logger] = None,
+                 max_workers: int = 4) -> None:
+        self.primary = primary
+        self.fallback = fallback
+        self.latency_budget = latency_budget
+        self.logger = logger or logging.getLogger("hedged_prompt_engine")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="prompt-hedge")
+        self.fallback_count = 0
+
+    def generate_prompt(self, category: str, daily_factors: Dict,
+                        logger: Optional[Logger] = None) -> str:
+        return self._hedge(
+            lambda: self.primary.generate_prompt(category, daily_factors, logger),
+            lambda: self.fallback.generate_prompt(category, daily_factors, logger),
+        )
+
+    def generate_from_description(self, description: str,
+                                  logger: Optional[Logger] = None) -> str:
+        return self._hedge(
+            lambda: self.primary.generate_from_description(description, logger),
+            lambda: self.fallback.generate_from_description(description, logger),
+        )
+
+    def _hedge(self, primary_call: Callable[[], str],
+               fallback_call: Callable[[], str]) -> str:
+        future = self.executor.submit(primary_call)
+        try:
+            prompt = future.result(timeout=self.latency_budget)
+            if prompt and not prompt.startswith(FAILURE_PREFIX):
+                return prompt
+            reason = prompt or "empty prompt"
+        except FutureTimeoutError:
+            reason = f"exceeded latency budget of {self.latency_budget}s"
+        except Exception as e:
+            reason = str(e)
+
+        self.fallback_count += 1
+        self.logger.warning(f"⚡ [HEDGE] Using fallback prompt engine: {reason}")
+        return fallback_call()
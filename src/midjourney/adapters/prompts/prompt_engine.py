@@ -13,14 +13,19 @@ from midjourney.domain.i_prompt_engine import PromptEngine
 
 class OpenAIPromptEngine(PromptEngine):
     def __init__(self, api_key: str,
-                 logger: Optional[Logger] = None) -> None:
+                 logger: Optional[Logger] = None,
+                 timeout: Optional[float] = None) -> None:
+        # `timeout` bounds each request; the SDK default is 600s
         if not logger:
             def_logger = logging.getLogger("def_logger")
         else:
             def_logger = logger
         if api_key:
             try:
-                self.client = openai.OpenAI(api_key=api_key)
+                if timeout:
+                    self.client = openai.OpenAI(api_key=api_key, timeout=timeout)
+                else:
+                    self.client = openai.OpenAI(api_key=api_key)
                 def_logger.info("Successfully")
             except Exception as e:
                 print(f"[PromptEngine Init Error]: {e}")
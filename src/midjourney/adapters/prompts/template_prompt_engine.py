@@ -0,0 +1,103 @@
+# Standard Library Imports
+import hashlib
+from typing import Dict, Optional
+
+# Internal Project Imports
+from midjourney.utils.logger.logger import Logger
+from midjourney.domain.i_prompt_engine import PromptEngine
+
+
+class TemplatePromptEngine(PromptEngine):
+    """
+    Builds prompts locally from the daily-factor fields and per-category
+    vocabularies. Deterministic for a given category and date, needs no
+    network and runs in microseconds, so it can stand in for OpenAI.
+    """
+    MAX_LENGTH = 350
+    SUFFIX = "--ar 9:16"
+
+    CATEGORY_VOCABULARY = {
+        "career": ["a golden staircase rising into the stars",
+                   "a radiant compass over an open road",
+                   "an ascending phoenix above a city skyline"],
+        "business": ["a glowing marketplace of floating lanterns",
+                     "a crystal ledger blooming with light",
+                     "a ship of gold sailing a sea of coins"],
+        "relationship": ["two intertwined rose vines of light",
+                         "a pair of swans beneath a heart-shaped moon",
+                         "twin flames dancing in a lotus"],
+        "wealth": ["a cascading waterfall of gold coins",
+                   "a jade treasure chest overflowing with gems",
+                   "a golden tree bearing glowing fruit"],
+        "family": ["an ancient tree sheltering a glowing home",
+                   "a circle of lanterns around a warm hearth",
+                   "a nest of light cradled in great branches"],
+        "health": ["a healing spring surrounded by lotus flowers",
+                   "a luminous tree of life with emerald leaves",
+                   "a serene figure bathed in restorative light"],
+        "education": ["an enchanted library with floating books",
+                      "an owl perched on a glowing scroll",
+                      "a tower of knowledge crowned with stars"],
+        "wellbeing": ["a tranquil zen garden under soft light",
+                      "a glowing lotus on still water",
+                      "a meditating figure wrapped in aurora"],
+        "spiritual": ["a sacred mandala of cosmic light",
+                      "a temple gate opening onto the galaxy",
+                      "a third eye blooming into a nebula"],
+        "happiness": ["a meadow of sunflowers beneath a rainbow",
+                      "butterflies of light rising at sunrise",
+                      "a carousel of stars spinning in joy"],
+        "luck": ["a four-leaf clover glowing in moonlight",
+                 "a golden horseshoe wrapped in starlight",
+                 "a lucky koi leaping through a waterfall"],
+    }
+    DEFAULT_SUBJECTS = ["a mystical talisman of light",
+                        "an enchanted crystal glowing with power",
+                        "a celestial gateway of auspicious energy"]
+    STYLES = ["ethereal, highly detailed, magical realism",
+              "dreamlike, luminous, intricate ornamentation",
+              "surreal, cinematic lighting, sacred geometry"]
+
+    def __init__(self, logger: Optional[Logger] = None) -> None:
+        self.logger = logger
+
+    def generate_prompt(self, category: str, daily_factors: Dict,
+                        logger: Optional[Logger] = None) -> str:
+        seed = self._seed(category, daily_factors["date"])
+        subjects = self.CATEGORY_VOCABULARY.get(category.lower(),
+                                                self.DEFAULT_SUBJECTS)
+        colors = daily_factors["luckyColors"]
+        numbers = ", ".join(map(str, daily_factors["luckyNumbers"]))
+        # Subject and style come from different bits of the seed
+        subject = subjects[(seed & 0xFFFF) % len(subjects)]
+        style = self.STYLES[(seed >> 16) % len(self.STYLES)]
+
+        prompt = (
+            f"{subject}, "
+            f"{daily_factors['lunarPhase']} glowing in the {daily_factors['season']} "
+            f"{daily_factors['timeOfDay'].lower()} sky, "
+            f"{daily_factors['element']} energy and "
+            f"{daily_factors['planetaryInfluence']} sigils, "
+            f"palette of {', '.join(colors)}, "
+            f"sacred numbers {numbers} woven into the scene, "
+            f"{style}"
+        )
+        return self._finish(prompt)
+
+    def generate_from_description(self, description: str,
+                                  logger: Optional[Logger] = None) -> str:
+        style = self.STYLES[self._seed(description) % len(self.STYLES)]
+        prompt = f"{description.strip().rstrip('.')}, mystical and auspicious, {style}"
+        return self._finish(prompt)
+
+    def _finish(self, prompt: str) -> str:
+        limit = self.MAX_LENGTH - len(self.SUFFIX) - 1
+        if len(prompt) > limit:
+            prompt = prompt[:limit].rsplit(" ", 1)[0].rstrip(",")
+        return f"{prompt} {self.SUFFIX}"
+
+    @staticmethod
+    def _seed(*parts: str) -> int:
+        # Stable across processes, unlike hash()
+        digest = hashlib.md5("|".join(parts).encode("utf-8")).hexdigest()
+        return int(digest[:8], 16)
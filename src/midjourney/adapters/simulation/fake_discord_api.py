@@ -0,0 +1,200 @@
+# Standard Library Imports
+import json
+import struct
+import threading
+import time
+import itertools
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+# Internal Project Imports
+from midjourney.adapters.discord.discord_engine import snowflake_at
+from midjourney.adapters.simulation.sim_discord_engine import SimulatedDiscordEngine
+
+
+def _solid_png(width: int, height: int, rgb=(200, 160, 60)) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    row = b"\x00" + bytes(rgb) * width
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * height))
+            + chunk(b"IEND", b""))
+
+
+class FakeDiscordAPI:
+    """
+    Local HTTP stand-in for the parts of the Discord API DiscordEngine
+    uses, with a Midjourney bot that answers /imagine with a grid and
+    button clicks with an upscale after configurable delays.
+
+        api = FakeDiscordAPI().start()
+        engine = DiscordEngine(..., base_url=api.base_url, poll_interval=0.05)
+
+    Every request is recorded in `requests` as (method, path, response
+    item count), and every message poll in `polls` as (channel id,
+    limit), so callers can check what was polled.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 grid_delay: float = 0.2, upscale_delay: float = 0.1,
+                 image_size: int = 64) -> None:
+        self.grid_delay = grid_delay
+        self.upscale_delay = upscale_delay
+        self.image = _solid_png(image_size, image_size)
+        self.channels: dict[str, list[dict]] = {}
+        self.threads: dict[str, dict] = {}
+        self.requests: list[tuple[str, str, Optional[int]]] = []
+        self.polls: list[tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v9"
+
+    def start(self) -> "FakeDiscordAPI":
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # --- fake Midjourney behaviour -------------------------------------
+
+    def _post_message(self, channel_id: str, prompt: str, grid: bool,
+                      delay: float) -> None:
+        # Snowflake ids, increasing with creation time like Discord's
+        message_id = str(snowflake_at(time.time()) + next(self._sequence) % 4096)
+        message = {
+            "id": message_id,
+            "channel_id": channel_id,
+            "content": (f"**{prompt}** - <@fake> (fast)" if grid
+                        else f"**{prompt}** - Image #1 <@fake>"),
+            "attachments": [{"url": f"{self.base_url}/attachments/{message_id}.png"}],
+            "ready_at": time.monotonic() + delay,
+            "prompt": prompt,
+        }
+        if grid:
+            message["components"] = [{"type": 1, "components": [
+                {"type": 2, "label": f"U{i}",
+                 "custom_id": f"MJ::JOB::upsample::{i}::{message_id}"}
+                for i in range(1, 5)
+            ]}]
+        with self._lock:
+            self.channels.setdefault(channel_id, []).append(message)
+
+    def _interaction(self, body: dict) -> int:
+        channel_id = body.get("channel_id")
+        if channel_id in self.threads and self.threads[channel_id]["deleted"]:
+            return 404
+        if body.get("type") == 2:
+            prompt = body["data"]["options"][0]["value"]
+            for index, expanded in enumerate(SimulatedDiscordEngine._expand(prompt)):
+                self._post_message(channel_id, expanded, grid=True,
+                                   delay=self.grid_delay * (index + 1))
+            return 204
+        if body.get("type") == 3:
+            with self._lock:
+                grid = next((m for m in self.channels.get(channel_id, [])
+                             if m["id"] == body.get("message_id")), None)
+            if grid is None:
+                return 404
+            self._post_message(channel_id, grid["prompt"], grid=False,
+                               delay=self.upscale_delay)
+            return 204
+        return 400
+
+    def _messages(self, channel_id: str, limit: int) -> Optional[list[dict]]:
+        if channel_id in self.threads and self.threads[channel_id]["deleted"]:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            ready = [m for m in self.channels.get(channel_id, []) if m["ready_at"] <= now]
+        ready.reverse()  # newest first
+        return [{k: v for k, v in m.items() if k not in ("ready_at", "prompt")}
+                for m in ready[:limit]]
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, payload=None, raw: Optional[bytes] = None,
+                      content_type: str = "application/json", count: Optional[int] = None):
+                api.requests.append((self.command, urlparse(self.path).path, count))
+                body = raw if raw is not None else (
+                    json.dumps(payload).encode() if payload is not None else b"")
+                self.send_response(status)
+                if body:
+                    self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> dict:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _parts(self) -> list[str]:
+                path = urlparse(self.path).path
+                return [p for p in path.split("/") if p][2:]  # drop api/v9
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path.startswith("/api/v9/attachments/"):
+                    return self._send(200, raw=api.image, content_type="image/png")
+                parts = self._parts()
+                if len(parts) == 3 and parts[0] == "channels" and parts[2] == "messages":
+                    limit = int(parse_qs(parsed.query).get("limit", ["50"])[0])
+                    api.polls.append((parts[1], limit))
+                    messages = api._messages(parts[1], limit)
+                    if messages is None:
+                        return self._send(404, {"message": "Unknown Channel"})
+                    return self._send(200, messages, count=len(messages))
+                self._send(404, {"message": "Not found"})
+
+            def do_POST(self):
+                parts = self._parts()
+                body = self._body()
+                if parts == ["interactions"]:
+                    return self._send(api._interaction(body))
+                if len(parts) == 3 and parts[0] == "channels" and parts[2] == "threads":
+                    thread_id = uuid.uuid4().hex
+                    api.threads[thread_id] = {"parent_id": parts[1], "name": body.get("name"),
+                                              "archived": False, "deleted": False}
+                    return self._send(201, {"id": thread_id, "type": 11,
+                                            "parent_id": parts[1], "name": body.get("name")})
+                self._send(404, {"message": "Not found"})
+
+            def do_PATCH(self):
+                parts = self._parts()
+                thread = api.threads.get(parts[1]) if len(parts) == 2 else None
+                if not thread:
+                    return self._send(404, {"message": "Unknown Channel"})
+                thread.update({k: v for k, v in self._body().items()
+                               if k in ("archived", "locked")})
+                self._send(200, {"id": parts[1], "type": 11})
+
+            def do_DELETE(self):
+                parts = self._parts()
+                thread = api.threads.get(parts[1]) if len(parts) == 2 else None
+                if not thread:
+                    return self._send(404, {"message": "Unknown Channel"})
+                thread["deleted"] = True
+                self._send(200, {"id": parts[1], "type": 11})
+
+        return Handler
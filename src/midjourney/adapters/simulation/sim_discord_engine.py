@@ -0,0 +1,129 @@
+# Standard Library Imports
+import random
+import re
+import uuid
+from typing import Optional
+
+# Internal Project Imports
+from midjourney.adapters.discord.discord_engine import DiscordEngine, normalize_prompt
+from midjourney.utils.clock.clock import Clock
+
+
+class SimulatedDiscordEngine(DiscordEngine):
+    """
+    DiscordEngine whose HTTP calls are replaced by a simulated Midjourney
+    channel driven by a (usually virtual) clock. Grid and upscale render
+    times are drawn from log-normal distributions; each interaction can
+    fail with a configured probability. The polling, retry and checkpoint
+    logic of DiscordEngine itself runs unchanged.
+    """
+
+    def __init__(self, channel_id: str, clock: Clock,
+                 seed: Optional[int] = None,
+                 grid_time: tuple[float, float] = (60.0, 0.35),
+                 upscale_time: tuple[float, float] = (25.0, 0.3),
+                 send_failure_rate: float = 0.02,
+                 grid_lost_rate: float = 0.02,
+                 click_failure_rate: float = 0.02,
+                 upscale_lost_rate: float = 0.02,
+                 download_failure_rate: float = 0.01,
+                 **kwargs) -> None:
+        super().__init__(
+            discord_token="simulated",
+            application_id="simulated",
+            guild_id="simulated",
+            channel_id=channel_id,
+            version="simulated",
+            command_id="simulated",
+            clock=clock,
+            **kwargs,
+        )
+        self.random = random.Random(seed)
+        # (median seconds, log-normal sigma)
+        self.grid_time = grid_time
+        self.upscale_time = upscale_time
+        self.send_failure_rate = send_failure_rate
+        self.grid_lost_rate = grid_lost_rate
+        self.click_failure_rate = click_failure_rate
+        self.upscale_lost_rate = upscale_lost_rate
+        self.download_failure_rate = download_failure_rate
+        # Simulated channel messages: grids and upscales being rendered
+        self._pending: list[dict] = []
+        self.interactions = 0
+
+    def _render_time(self, spec: tuple[float, float]) -> float:
+        median, sigma = spec
+        return self.random.lognormvariate(0.0, sigma) * median
+
+    def _fails(self, rate: float) -> bool:
+        return self.random.random() < rate
+
+    @staticmethod
+    def _expand(prompt: str) -> list[str]:
+        # Expand a "{a, b} --params" permutation prompt like Midjourney does
+        match = re.search(r"\{(.*)\}", prompt)
+        if not match:
+            return [prompt]
+        options = re.split(r"(?<!\\),\s*", match.group(1))
+        return [
+            prompt[:match.start()] + option.replace("\\,", ",") + prompt[match.end():]
+            for option in options
+        ]
+
+    def _send_prompt(self, prompt: str):
+        self.interactions += 1
+        if self._fails(self.send_failure_rate):
+            raise Exception("Failed to send prompt: 500 - simulated failure")
+        ready_at = self.clock.now()
+        for expanded in self._expand(normalize_prompt(prompt)):
+            # Midjourney renders a permutation's jobs one after another
+            ready_at += self._render_time(self.grid_time)
+            if not self._fails(self.grid_lost_rate):
+                self._pending.append({
+                    "id": "grid-" + uuid.uuid4().hex,
+                    "prompt": expanded,
+                    "grid": True,
+                    "ready_at": ready_at,
+                })
+
+    def _send_component_interaction(self, custom_id: str, message_id: str):
+        self.interactions += 1
+        if self._fails(self.click_failure_rate):
+            raise Exception("Button click failed: 500 - simulated failure")
+        grid = next((m for m in self._pending if m["id"] == message_id), None)
+        if grid is None:
+            raise Exception("Button click failed: 404 - unknown message")
+        self._pending.remove(grid)
+        if not self._fails(self.upscale_lost_rate):
+            self._pending.append({
+                "id": uuid.uuid4().hex,
+                "prompt": grid["prompt"],
+                "grid": False,
+                "ready_at": self.clock.now() + self._render_time(self.upscale_time),
+            })
+
+    def _get_messages(self):
+        now = self.clock.now()
+        ready = [m for m in self._pending if m["ready_at"] <= now]
+        messages = []
+        # Newest first, like the Discord API
+        for item in sorted(ready, key=lambda m: m["ready_at"], reverse=True):
+            message = {
+                "id": item["id"],
+                "content": f"**{item['prompt']}** - <@simulated> (fast)",
+                "attachments": [{"url": f"https://sim.invalid/{uuid.uuid4().hex}.png"}],
+            }
+            if item["grid"]:
+                message["components"] = [{"components": [
+                    {"label": f"U{i}", "custom_id": f"sim::upsample::{i}"}
+                    for i in range(1, 5)
+                ]}]
+            messages.append(message)
+        return messages
+
+    def _download_image(self, image_url: str):
+        if self._fails(self.download_failure_rate):
+            raise Exception("Failed to download image: 503")
+        # Downloaded upscales leave the simulated channel
+        self._pending = [m for m in self._pending if m["grid"] or m["ready_at"] > self.clock.now()]
+        self.image_path_str = f"simulated/{uuid.uuid4().hex}.png"
@@ -0,0 +1,42 @@
+# Standard Library Imports
+import random
+from typing import Dict, Optional
+
+# Internal Project Imports
+from midjourney.utils.logger.logger import Logger
+from midjourney.utils.clock.clock import Clock
+from midjourney.domain.i_prompt_engine import PromptEngine
+from midjourney.adapters.prompts.template_prompt_engine import TemplatePromptEngine
+
+
+class SimulatedPromptEngine(PromptEngine):
+    """
+    Stands in for OpenAIPromptEngine: waits a log-normal latency on the
+    given clock, fails with `failure_rate`, and otherwise returns a
+    template prompt.
+    """
+
+    def __init__(self, clock: Clock, seed: Optional[int] = None,
+                 latency: tuple[float, float] = (4.0, 0.5),
+                 failure_rate: float = 0.02) -> None:
+        self.clock = clock
+        self.random = random.Random(seed)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.templates = TemplatePromptEngine()
+
+    def _call(self) -> None:
+        median, sigma = self.latency
+        self.clock.sleep(self.random.lognormvariate(0.0, sigma) * median)
+        if self.random.random() < self.failure_rate:
+            raise RuntimeError("Prompt generation failed: simulated OpenAI error")
+
+    def generate_prompt(self, category: str, daily_factors: Dict,
+                        logger: Optional[Logger] = None) -> str:
+        self._call()
+        return self.templates.generate_prompt(category, daily_factors, logger)
+
+    def generate_from_description(self, description: str,
+                                  logger: Optional[Logger] = None) -> str:
+        self._call()
+        return self.templates.generate_from_description(description, logger)
@@ -6,10 +6,17 @@ from typing import Optional
 from midjourney.config.load_config import load_config
 from midjourney.utils.logger.logger import Logger
 from midjourney.utils.logger.app_logger import AppLogger
+from midjourney.utils.tracing.tracer import Tracer
 from midjourney.domain.i_daily_factors import DailyFactors
 from midjourney.adapters.factors.daily_factors import DefaultDailyFactors
 from midjourney.domain.i_prompt_engine import PromptEngine
 from midjourney.adapters.prompts.prompt_engine import OpenAIPromptEngine
+from midjourney.adapters.prompts.template_prompt_engine import TemplatePromptEngine
+from midjourney.adapters.prompts.hedged_prompt_engine import HedgedPromptEngine
+from midjourney.adapters.images.post_processor import (
+    ImagePostProcessor,
+    parse_variants,
+)
 
 
 class Container:
@@ -21,11 +28,17 @@ class Container:
         logger (Optional[Logger]): Logging interface.
         daily_factors (Optional[DailyFactors]): Provides
             daily factors like lunar phase, numerology, etc.
+        post_processor (Optional[ImagePostProcessor]): Optional stage that
+            renders derivative sizes of each downloaded image.
+        tracer (Optional[Tracer]): Per-job span tracer, disabled unless
+            TRACE_FILE is set.
     """
     config: Optional[dict] = None
     logger: Optional[Logger] = None
     daily_factors: Optional[DailyFactors] = None
     promptEngine: Optional[PromptEngine] = None
+    post_processor: Optional[ImagePostProcessor] = None
+    tracer: Optional[Tracer] = None
 
     @classmethod
     def init(cls) -> None:
@@ -56,6 +69,9 @@ class Container:
         # Initialize logger
         cls.logger = AppLogger(name="midjour", level=log_level, log_file=True)
 
+        # Initialize the tracer (a no-op unless TRACE_FILE is set)
+        cls.tracer = Tracer(cls.config.get("TRACE_FILE"))
+
         # Initialize daily factors provider
         cls.daily_factors = DefaultDailyFactors()
 
@@ -66,7 +82,33 @@ class Container:
                     "OPENAI_API_KEY is missing or invalid in configuration"
             )
 
-        cls.promptEngine = OpenAIPromptEngine(
+        # Hedge OpenAI with the local template engine; a budget of 0
+        # disables the fallback. Hedged calls get a request timeout of
+        # twice the budget, so an abandoned call cannot hang the
+        # interpreter at exit for the SDK's default timeout.
+        latency_budget = float(cls.config.get("PROMPT_LATENCY_BUDGET") or 0)
+        openai_engine = OpenAIPromptEngine(
                 api_key=open_ai_key,
-                logger=cls.logger
+                logger=cls.logger,
+                timeout=2 * latency_budget if latency_budget > 0 else None
         )
+
+        if latency_budget > 0:
+            cls.promptEngine = HedgedPromptEngine(
+                    primary=openai_engine,
+                    fallback=TemplatePromptEngine(logger=cls.logger),
+                    latency_budget=latency_budget,
+                    logger=cls.logger
+            )
+        else:
+            cls.promptEngine = openai_engine
+
+        # Initializing the optional image post-processing stage
+        variants_spec = cls.config.get("POSTPROCESS_VARIANTS")
+        if variants_spec:
+            workers = cls.config.get("POSTPROCESS_WORKERS")
+            cls.post_processor = ImagePostProcessor(
+                    variants=parse_variants(variants_spec),
+                    max_workers=int(workers) if workers else None,
+                    logger=cls.logger
+            )
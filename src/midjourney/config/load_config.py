@@ -15,6 +15,16 @@ def load_config():
             "DISCORD_VERSION": os.getenv("DISCORD_VERSION"),
             "DISCORD_ID": os.getenv("DISCORD_ID"),
             "DISCORD_AUTH_TOKEN": os.getenv("DISCORD_AUTH_TOKEN"),
+            "DISCORD_API_BASE_URL": os.getenv("DISCORD_API_BASE_URL"),
+            "DISCORD_USE_THREADS": os.getenv("DISCORD_USE_THREADS", "false"),
+            "DISCORD_THREAD_CLEANUP": os.getenv("DISCORD_THREAD_CLEANUP", "archive"),
             "LEVEL": os.getenv("LOG_LEVEL", "INFO"),
-            "BASE_OUTPUT_FOLDER": os.getenv("BASE_OUTPUT_FOLDER")
+            "BASE_OUTPUT_FOLDER": os.getenv("BASE_OUTPUT_FOLDER"),
+            "POSTPROCESS_VARIANTS": os.getenv("POSTPROCESS_VARIANTS"),
+            "POSTPROCESS_WORKERS": os.getenv("POSTPROCESS_WORKERS"),
+            "GRID_SPLIT_MODE": os.getenv("GRID_SPLIT_MODE", "false"),
+            "TRACE_FILE": os.getenv("TRACE_FILE"),
+            "PROMPT_LATENCY_BUDGET": os.getenv("PROMPT_LATENCY_BUDGET", "20"),
+            "PERMUTATION_MAX_JOBS": os.getenv("PERMUTATION_MAX_JOBS", "4"),
+            "PROMPT_MAX_LENGTH": os.getenv("PROMPT_MAX_LENGTH", "350"),
     }
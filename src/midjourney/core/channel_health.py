@@ -0,0 +1,107 @@
+# standard library imports
+import threading
+from typing import Optional
+
+# Internal Project Module Imports
+from midjourney.utils.clock.clock import Clock, SystemClock
+
+
+class ChannelHealth:
+    """
+    Tracks EWMA latency and error rate for one Discord channel and acts as
+    a circuit breaker for it.
+
+    States:
+        closed    - healthy, jobs are routed normally.
+        open      - tripped after repeated failures; no jobs until the
+                    cool-down expires. A rate limit opens it for just
+                    its retry_after.
+        half_open - cool-down expired; a single probe job is let through.
+                    Success closes the circuit, failure re-opens it.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, alpha: float = 0.3,
+                 failure_threshold: int = 3, cooldown: float = 300.0,
+                 initial_latency: float = 180.0,
+                 clock: Optional[Clock] = None) -> None:
+        self.name = name
+        self.clock = clock or SystemClock()
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.ewma_latency = initial_latency
+        self.ewma_error = 0.0
+        self.consecutive_failures = 0
+        self.state = self.CLOSED
+        self._open_until = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def expected_completion(self) -> float:
+        """
+        Expected seconds to complete a job here, counting failed attempts.
+        """
+        return self.ewma_latency / max(1.0 - self.ewma_error, 0.05)
+
+    def try_acquire(self, now: Optional[float] = None) -> bool:
+        """
+        Return True if a job may be routed to this channel right now.
+        In the half-open state only one probe is allowed at a time.
+        """
+        now = self.clock.now() if now is None else now
+        with self._lock:
+            if self.state == self.OPEN:
+                if now < self._open_until:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.ewma_latency += self.alpha * (latency - self.ewma_latency)
+            self.ewma_error *= (1.0 - self.alpha)
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            self.state = self.CLOSED
+
+    def record_failure(self, latency: Optional[float] = None,
+                       retry_after: Optional[float] = None,
+                       now: Optional[float] = None) -> None:
+        now = self.clock.now() if now is None else now
+        with self._lock:
+            if latency is not None:
+                self.ewma_latency += self.alpha * (latency - self.ewma_latency)
+            self.ewma_error += self.alpha * (1.0 - self.ewma_error)
+            self.consecutive_failures += 1
+            was_probe = self._probe_in_flight
+            self._probe_in_flight = False
+            if was_probe or self.consecutive_failures >= self.failure_threshold:
+                self._open(now + max(self.cooldown, retry_after or 0.0))
+            elif retry_after is not None:
+                # A rate limit only blocks the channel as long as Discord asks
+                self._open(now + retry_after)
+
+    def _open(self, until: float) -> None:
+        # Caller holds self._lock; never shortens an open circuit
+        if self.state != self.OPEN:
+            self._open_until = until
+        else:
+            self._open_until = max(self._open_until, until)
+        self.state = self.OPEN
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "channel": self.name,
+                "state": self.state,
+                "ewma_latency": round(self.ewma_latency, 2),
+                "ewma_error": round(self.ewma_error, 3),
+                "consecutive_failures": self.consecutive_failures,
+            }
@@ -0,0 +1,61 @@
+# standard library imports
+import uuid
+import concurrent.futures
+from concurrent.futures import Future
+from typing import Callable, Iterable, Iterator, Optional
+
+
+class Job:
+    """
+    Handle for a single prompt enqueued through `ImageGenerator.message_push`.
+    Wraps a `concurrent.futures.Future` that resolves to the job's result
+    entry (the same dict written to results.log) or to the exception
+    that made the job fail.
+    """
+
+    def __init__(self, message: dict) -> None:
+        self.job_id: str = uuid.uuid4().hex[:12]
+        self.message = message
+        self.future: Future = Future()
+        # Stage checkpoints from DiscordEngine.generate_image and the
+        # number of attempts made per stage, used to resume on retry.
+        self.checkpoint: dict = {}
+        self.attempts: dict[str, int] = {}
+
+    @property
+    def prompt(self) -> str:
+        return self.message["prompt"]
+
+    @property
+    def category(self) -> Optional[str]:
+        return self.message.get("category")
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> dict:
+        return self.future.result(timeout=timeout)
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        return self.future.exception(timeout=timeout)
+
+    def add_done_callback(self, fn: Callable[["Job"], None]) -> None:
+        """
+        Call `fn(job)` once the job finishes. If it already has, `fn`
+        runs immediately in the calling thread.
+        """
+        self.future.add_done_callback(lambda _f: fn(self))
+
+    def __repr__(self) -> str:
+        state = self.future._state.lower()
+        return f"<Job {self.job_id} category={self.category} state={state}>"
+
+
+def as_completed(jobs: Iterable[Job],
+                 timeout: Optional[float] = None) -> Iterator[Job]:
+    """
+    Yield jobs as they finish, in completion order.
+    """
+    by_future = {job.future: job for job in jobs}
+    for future in concurrent.futures.as_completed(by_future, timeout=timeout):
+        yield by_future[future]
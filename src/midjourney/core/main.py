@@ -3,11 +3,22 @@ import os
 import threading
 from datetime import datetime
 from queue import Queue, Empty
-from time import sleep
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional, Union
 from midjourney.config.container import Container
 from midjourney.utils.logger.logger import Logger
-from midjourney.adapters.discord.discord_engine import DiscordEngine
+from midjourney.adapters.discord.discord_engine import (
+    DiscordEngine,
+    StageFailed,
+    normalize_prompt,
+)
+from midjourney.adapters.images import grid_splitter
+from midjourney.core.job import Job, as_completed
+from midjourney.core.channel_health import ChannelHealth
+from midjourney.core.retry import RetryPolicy
+from midjourney.core.permutation import build_pack_prompt, pack_messages
+from midjourney.core.prompt_validator import PromptRejected, PromptValidator
+from midjourney.utils.tracing.tracer import Tracer
+from midjourney.utils.clock.clock import Clock, SystemClock
 
 
 class ImageGenerator:
@@ -25,7 +36,28 @@ class ImageGenerator:
         "luck",
     ]
 
-    def __init__(self):
+    # Per-stage retry policies; a retry resumes from the job's checkpoint
+    # on the same channel rather than sending a new /imagine.
+    STAGE_RETRY_POLICIES = {
+        "send": RetryPolicy(max_attempts=2, backoff=5),
+        "grid": RetryPolicy(max_attempts=2, backoff=10),
+        "upscale_click": RetryPolicy(max_attempts=3, backoff=5),
+        "upscale": RetryPolicy(max_attempts=2, backoff=10),
+        "download": RetryPolicy(max_attempts=3, backoff=5),
+    }
+    # Extra generations tried when a prompt fails validation
+    PROMPT_REGENERATE_ATTEMPTS = 2
+
+    def __init__(self, split_grid: Optional[bool] = None,
+                 trace_file: Optional[str] = None,
+                 engines: Optional[dict[str, DiscordEngine]] = None,
+                 clock: Optional[Clock] = None,
+                 num_workers: int = 2):
+        """
+        By default two DiscordEngines are built from the configured
+        channels. `engines` and `clock` can be injected instead, e.g. by
+        the simulation mode in `midjourney.core.simulation`.
+        """
         try:
             Container.init()
         except Exception as e:
@@ -36,6 +68,52 @@ class ImageGenerator:
                 "Logger not initialized. Please ensure Container.init() was called"
             )
 
+        self.logger: Logger = Container.logger
+        self.clock: Clock = clock or SystemClock()
+        if trace_file:
+            # --trace replaces the TRACE_FILE tracer, which must not save
+            # (an empty trace) at exit as well
+            if Container.tracer:
+                Container.tracer.close()
+            Container.tracer = Tracer(trace_file)
+        self.tracer: Tracer = Container.tracer
+        if clock is not None:
+            # Spans of a simulated run are measured in its virtual time
+            self.tracer.use_clock(self.clock)
+        self.results_log_path: Optional[str] = "../storage/results.log"
+        self.permutation_max_jobs = int(
+            (Container.config or {}).get("PERMUTATION_MAX_JOBS") or 4
+        )
+        self.prompt_validator = PromptValidator(max_length=int(
+            (Container.config or {}).get("PROMPT_MAX_LENGTH") or 350
+        ))
+        self.logger.info("🚀 Midjourney bot started successfully.")
+
+        if engines is None:
+            engines = self._engines_from_config(split_grid)
+        else:
+            # Injected engines trace their stages into this generator's trace
+            for engine in engines.values():
+                engine.tracer = self.tracer
+
+        self.engines = {
+            name: (engine, threading.Lock()) for name, engine in engines.items()
+        }
+        self.channel_health = {
+            name: ChannelHealth(name, clock=self.clock) for name in self.engines
+        }
+
+        self.message_queue: Queue[dict] = Queue()
+        # Single-flight map of dedupe key -> queued or in-flight job
+        self._inflight: dict[str, Job] = {}
+        self._inflight_lock = threading.Lock()
+        self._shutdown_event = threading.Event()
+        self.worker_threads: list[threading.Thread] = []
+
+        # Start multiple worker threads
+        self._start_worker_threads(num_threads=num_workers)
+
+    def _engines_from_config(self, split_grid: Optional[bool]) -> dict[str, DiscordEngine]:
         config = Container.config
         # creating config here
         discord_token = config['DISCORD_AUTH_TOKEN']
@@ -45,9 +123,24 @@ class ImageGenerator:
         command_id = config['DISCORD_ID']
         channel_id_1 = config['DISCORD_CHANNEL_ID_1']
         channel_id_2 = config['DISCORD_CHANNEL_ID_2']
+        if split_grid is None:
+            split_grid = str(config.get('GRID_SPLIT_MODE', 'false')).lower() in (
+                "1", "true", "yes"
+            )
+        if split_grid:
+            # Fail at startup rather than after each job's Discord round trip
+            try:
+                import PIL  # noqa: F401
+            except ImportError as e:
+                raise RuntimeError(
+                    "Grid split mode requires Pillow (pip install pillow)"
+                ) from e
+        use_threads = str(config.get('DISCORD_USE_THREADS', 'false')).lower() in (
+            "1", "true", "yes"
+        )
+        thread_cleanup = config.get('DISCORD_THREAD_CLEANUP') or "archive"
+        base_url = config.get('DISCORD_API_BASE_URL') or "https://discord.com/api/v9"
 
-        self.logger: Logger = Container.logger
-        self.logger.info("🚀 Midjourney bot started successfully.")
         self.discord_engine_1 = DiscordEngine(
             discord_token=discord_token,
             application_id=application_id,
@@ -56,6 +149,12 @@ class ImageGenerator:
             version=version,
             command_id=command_id,
             logger=self.logger,
+            split_grid=split_grid,
+            tracer=self.tracer,
+            clock=self.clock,
+            use_threads=use_threads,
+            thread_cleanup=thread_cleanup,
+            base_url=base_url,
         )
 
         self.discord_engine_2 = DiscordEngine(
@@ -66,20 +165,19 @@ class ImageGenerator:
             version=version,
             command_id=command_id,
             logger=self.logger,
+            split_grid=split_grid,
+            tracer=self.tracer,
+            clock=self.clock,
+            use_threads=use_threads,
+            thread_cleanup=thread_cleanup,
+            base_url=base_url,
         )
 
-        self.engines = {
-            "engine1": (self.discord_engine_1, threading.Lock()),
-            "engine2": (self.discord_engine_2, threading.Lock()),
+        return {
+            "engine1": self.discord_engine_1,
+            "engine2": self.discord_engine_2,
         }
 
-        self.message_queue: Queue[str] = Queue()
-        self._shutdown_event = threading.Event()
-        self.worker_threads: list[threading.Thread] = []
-
-        # Start multiple worker threads
-        self._start_worker_threads(num_threads=2)
-
     def _start_worker_threads(self, num_threads: int):
         for i in range(num_threads):
             t = threading.Thread(target=self._process_queue_loop, daemon=True)
@@ -88,7 +186,9 @@ class ImageGenerator:
             self.logger.info(f"🧵 Worker thread-{i + 1} started.")
 
     def log_result(self, result):
-        log_file_path = "../storage/results.log"
+        log_file_path = self.results_log_path
+        if not log_file_path:
+            return
         log_dir = os.path.dirname(log_file_path)
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
@@ -97,75 +197,301 @@ class ImageGenerator:
             f.write("\n")
 
     def _get_available_engine(self) -> Optional[tuple[str, DiscordEngine]]:
-        for name, (engine, lock) in self.engines.items():
-            if lock.acquire(blocking=False):
+        # Prefer the channel with the best expected completion time,
+        # skipping channels whose circuit is open.
+        ranked = sorted(
+            self.engines,
+            key=lambda name: self.channel_health[name].expected_completion(),
+        )
+        for name in ranked:
+            engine, lock = self.engines[name]
+            if not lock.acquire(blocking=False):
+                continue
+            if self.channel_health[name].try_acquire():
                 return name, engine
+            lock.release()
         return None
 
+    def _record_engine_outcome(self, engine_name: str, started: float,
+                               error: Optional[Exception] = None,
+                               jobs: int = 1):
+        # A pack holds the channel for all of its jobs; record per-job latency
+        health = self.channel_health[engine_name]
+        latency = (self.clock.now() - started) / max(jobs, 1)
+        if error is None:
+            health.record_success(latency)
+            return
+        # Rate-limited stages were already reported by _wait_before_retry
+        retry_after = None if isinstance(error, StageFailed) else getattr(
+            error, "retry_after", None
+        )
+        health.record_failure(latency, retry_after=retry_after)
+        self._log_if_open(engine_name)
+
+    def _log_if_open(self, engine_name: str):
+        health = self.channel_health[engine_name]
+        if health.state == ChannelHealth.OPEN:
+            self.logger.warning(
+                f"🚧 Circuit open for {engine_name}: {health.snapshot()}"
+            )
+
     def _release_engine(self, engine_name: str):
         self.engines[engine_name][1].release()
 
     def _process_queue_loop(self):
+        self.clock.register()
+        try:
+            self._run_worker()
+        finally:
+            self.clock.unregister()
+
+    def _run_worker(self):
         while not self._shutdown_event.is_set():
             try:
-                message = self.message_queue.get(timeout=1)
-                prompt = message["prompt"]
-                category = message["category"]
-                date_based = message["date_based"]
-                user_prompt = message["user_prompt"]
-                description = message["description"]
+                message = self.clock.queue_get(self.message_queue, timeout=1)
+                job: Job = message["job"]
             except Empty:
                 continue
 
-            engine_name = None
-            try:
+            if not job.future.set_running_or_notify_cancel():
+                self.logger.info(f"🚫 Job {job.job_id} was cancelled, skipping.")
+                self.message_queue.task_done()
+                continue
+
+            with self.tracer.span("job", job_id=job.job_id, category=job.category):
+                self._process_job(job, message)
+
+    def _process_job(self, job: Job, message: dict):
+        engine_name = None
+        queue_item_owned = True
+        try:
+            with self.tracer.span("engine_lock_wait"):
                 while not self._shutdown_event.is_set():
                     engine_info = self._get_available_engine()
                     if engine_info:
                         engine_name, engine = engine_info
                         break
                     else:
-                        sleep(0.5)
-
-                if not engine_name:
-                    self.logger.error("❌ No engine available for prompt.")
-                    continue
-
-                result_img_url = engine.generate_image(prompt)
-                self.logger.info(f"✅ Prompt sent via {engine_name}")
-
-                # Log the result
-                log_entry = {
-                    "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "prompt": prompt,
-                    "result_img_url": result_img_url,
-                    "category": category,
-                    "details": {
-                        "date_based": date_based,
-                        "user_prompt": user_prompt,
-                        "description": description,
-                    },
-                }
-                self.log_result(log_entry)
+                        self.clock.sleep(0.5)
 
-            except Exception as e:
-                self.logger.error(f"❌ Error processing prompt: {e}")
+            if not engine_name:
+                self.logger.error("❌ No engine available for prompt.")
+                raise RuntimeError("No engine available for prompt.")
 
+            started = self.clock.now()
+            try:
+                if "pack" in message:
+                    outcomes = self._generate_pack(engine_name, engine, job, message["pack"])
+                else:
+                    outcomes = [(message, self._generate_with_retries(engine_name, engine, job))]
+            except Exception as e:
+                self._record_engine_outcome(engine_name, started, e,
+                                            jobs=len(message.get("pack", [])) or 1)
+                raise
             finally:
-                if engine_name:
-                    self._release_engine(engine_name)
-                    self.logger.info(f"🔓 Released lock for {engine_name}")
+                engine.close_job_thread(job.checkpoint)
+            self._record_engine_outcome(engine_name, started, jobs=len(outcomes))
+            self.logger.info(f"✅ Prompt sent via {engine_name}")
+
+            # Free the channel before any CPU-bound post-processing
+            self._release_engine(engine_name)
+            self.logger.info(f"🔓 Released lock for {engine_name}")
+            engine_name = None
+
+            # The queue item is done once every job in it has finished,
+            # which may happen later on the post-processing pool.
+            item_done = self._countdown(len(outcomes), self.message_queue.task_done)
+            queue_item_owned = False
+            for out_message, outcome in outcomes:
+                out_job: Job = out_message["job"]
+                if isinstance(outcome, Exception):
+                    out_job.future.set_exception(outcome)
+                    item_done()
+                else:
+                    self._finish_job(engine, out_job, out_message, outcome, item_done)
+            if "pack" in message:
+                job.future.set_result({
+                    "job_id": job.job_id,
+                    "pack": [m["job"].job_id for m, _ in outcomes],
+                })
+
+        except Exception as e:
+            self.logger.error(f"❌ Error processing prompt: {e}")
+            job.future.set_exception(e)
+            for sub_message in message.get("pack", []):
+                if not sub_message["job"].done():
+                    sub_message["job"].future.set_exception(e)
+
+        finally:
+            if engine_name:
+                self._release_engine(engine_name)
+                self.logger.info(f"🔓 Released lock for {engine_name}")
+            if queue_item_owned:
                 self.message_queue.task_done()
 
+    def _finish_job(self, engine: DiscordEngine, job: Job, message: dict,
+                    result_img_url: str, item_done: Callable[[], None]):
+        try:
+            image_paths = [result_img_url] if result_img_url else []
+            if engine.split_grid and result_img_url:
+                image_paths = grid_splitter.split_grid(result_img_url)
+                self.logger.info(f"✂️ Split grid into {len(image_paths)} images")
+
+            log_entry = {
+                "job_id": job.job_id,
+                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "prompt": message["prompt"],
+                "result_img_url": result_img_url,
+                "result_img_paths": image_paths,
+                "category": message["category"],
+                "checkpoint": job.checkpoint,
+                "attempts": job.attempts,
+                "details": {
+                    "date_based": message["date_based"],
+                    "user_prompt": message["user_prompt"],
+                    "description": message["description"],
+                },
+            }
+
+            post_processor = Container.post_processor
+            if post_processor and image_paths:
+                future = post_processor.submit(image_paths)
+                future.add_done_callback(
+                    lambda f, job=job, entry=log_entry:
+                        self._finish_post_processing(job, entry, f, item_done)
+                )
+                return
+            self._complete_job(job, log_entry)
+        except Exception as e:
+            self.logger.error(f"❌ Error finishing job {job.job_id}: {e}")
+            job.future.set_exception(e)
+        item_done()
+
+    def _generate_pack(self, engine_name: str, engine: DiscordEngine, pack_job: Job,
+                       sub_messages: list[dict]) -> list[tuple[dict, object]]:
+        """
+        Send one permutation prompt for the pack, then finish each
+        sub-job from its own grid. Returns (message, image path or
+        exception) per sub-job that was not cancelled.
+        """
+        live = {id(m) for m in sub_messages
+                if m["job"].future.set_running_or_notify_cancel()}
+        grids = None
+        while grids is None:
+            try:
+                grids = engine.imagine_pack(
+                    pack_job.prompt, [m["pack_text"] for m in sub_messages],
+                    pack_job.checkpoint,
+                )
+            except StageFailed as e:
+                self._wait_before_retry(engine_name, pack_job, e)
+
+        outcomes = []
+        for sub_message, grid in zip(sub_messages, grids):
+            if id(sub_message) not in live:
+                continue
+            sub_job: Job = sub_message["job"]
+            if grid is None:
+                outcomes.append((sub_message, RuntimeError(
+                    "Grid for this permutation entry never appeared."
+                )))
+                continue
+            sub_job.checkpoint.update(grid)
+            try:
+                outcomes.append((sub_message, self._generate_with_retries(engine_name, engine, sub_job)))
+            except Exception as e:
+                outcomes.append((sub_message, e))
+        return outcomes
+
+    @staticmethod
+    def _countdown(count: int, fn: Callable[[], None]) -> Callable[[], None]:
+        lock = threading.Lock()
+        remaining = [count]
+
+        def tick():
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                fn()
+
+        if count == 0:
+            fn()
+        return tick
+
+    def _generate_with_retries(self, engine_name: str, engine: DiscordEngine,
+                               job: Job) -> str:
+        while True:
+            try:
+                return engine.generate_image(job.prompt, job.checkpoint)
+            except StageFailed as e:
+                self._wait_before_retry(engine_name, job, e)
+
+    def _wait_before_retry(self, engine_name: str, job: Job, error: StageFailed):
+        # Re-raises `error` once the stage's retry policy is exhausted
+        if error.retry_after is not None:
+            # Open the circuit now so other workers route around this
+            # channel while this job waits out the rate limit.
+            self.channel_health[engine_name].record_failure(
+                retry_after=error.retry_after
+            )
+            self._log_if_open(engine_name)
+        attempts = job.attempts.get(error.stage, 0) + 1
+        job.attempts[error.stage] = attempts
+        policy = self.STAGE_RETRY_POLICIES.get(error.stage, RetryPolicy())
+        if self._shutdown_event.is_set() or not policy.should_retry(attempts):
+            self.logger.error(
+                f"❌ Job {job.job_id} gave up at stage '{error.stage}' "
+                f"after {attempts} attempt(s); checkpoint: {job.checkpoint}"
+            )
+            raise error
+        delay = policy.delay(attempts, error.retry_after)
+        self.logger.warning(
+            f"🔁 Job {job.job_id} retrying stage '{error.stage}' "
+            f"(attempt {attempts + 1}/{policy.max_attempts}) in {delay:.0f}s"
+        )
+        self.clock.sleep(delay)
+
+    def _complete_job(self, job: Job, log_entry: dict):
+        with self.tracer.span("log_result", job_id=job.job_id):
+            self.log_result(log_entry)
+        job.future.set_result(log_entry)
+
+    def _finish_post_processing(self, job: Job, log_entry: dict, future,
+                                item_done: Callable[[], None]):
+        # Runs on the process pool's callback thread once derivatives exist
+        try:
+            log_entry["derivatives"] = future.result()
+            self.logger.info(
+                f"🎨 [POST] {len(log_entry['derivatives'])} derivatives for job {job.job_id}"
+            )
+        except Exception as e:
+            self.logger.error(f"❌ [POST] Post-processing failed for job {job.job_id}: {e}")
+            log_entry["derivatives"] = []
+            log_entry["post_process_error"] = str(e)
+        try:
+            self._complete_job(job, log_entry)
+        except Exception as e:
+            job.future.set_exception(e)
+        finally:
+            item_done()
+
     def shutdown(self):
         self.logger.info("🛑 Shutting down worker threads...")
         self._shutdown_event.set()
         for t in self.worker_threads:
             t.join()
         self.message_queue.join()
+        if Container.post_processor:
+            Container.post_processor.shutdown(wait=True)
+        self.tracer.save()
         self.logger.info("✅ All worker threads stopped.")
 
-    def create_daily_factors(self, date: Optional[str] = None) -> dict:
+    def create_daily_factors(
+        self, date: Optional[Union[str, datetime]] = None
+    ) -> dict:
+        if isinstance(date, str):
+            date = datetime.strptime(date, "%Y-%m-%d")
         factors = Container.daily_factors.get_factors(date)
         self.logger.info(f"🌞 Daily Factors for {date or 'today'}: {factors}")
         return factors
@@ -173,73 +499,271 @@ class ImageGenerator:
     def generate_prompt(self, category: str, factors: dict) -> str:
         if not Container.promptEngine:
             raise RuntimeError("Prompt Engine not initialized")
-        prompt = Container.promptEngine.generate_prompt(category, factors, self.logger)
+        with self.tracer.span("prompt_generation", category=category):
+            prompt = Container.promptEngine.generate_prompt(category, factors, self.logger)
         return prompt
 
+    def _validated_prompt(self, generate: Callable[[], Optional[str]],
+                          label: str) -> Optional[str]:
+        """
+        Run `generate` and validate its output, generating again when the
+        prompt is rejected. Returns None if every attempt is rejected, so
+        bad prompts are dropped here instead of failing on Discord.
+        """
+        for attempt in range(1 + self.PROMPT_REGENERATE_ATTEMPTS):
+            prompt = generate()
+            try:
+                return self.prompt_validator.validate(prompt)
+            except PromptRejected as e:
+                self.logger.warning(
+                    f"🧪 Prompt for {label} rejected ({e.reason}), "
+                    f"attempt {attempt + 1}: {prompt!r}"
+                )
+        self.logger.error(f"❌ No valid prompt generated for {label}, skipping.")
+        return None
+
+    def _log_validation_stats(self) -> None:
+        stats = self.prompt_validator.report()
+        rejected = sum(v for k, v in stats.items() if k.startswith("rejected:"))
+        self.logger.info(
+            f"🧪 Prompt validation: {stats.get('accepted', 0)} accepted, "
+            f"{rejected} rejected so far {stats}"
+        )
+
     def message_push(
         self,
-        date: Optional[str] = None,
+        date: Optional[Union[str, datetime]] = None,
         category: Optional[str] = None,
         user_prompt: Optional[str] = None,
         description: Optional[str] = None,
-    ):
+        dedupe: bool = True,
+        pack: bool = False,
+    ) -> list[Job]:
+        """
+        Build the prompt(s) for the requested mode and enqueue them.
+        Returns one `Job` handle per enqueued prompt; each handle resolves
+        to the job's result entry once its image has been generated.
+
+        With `dedupe`, a prompt identical to one that is still queued or
+        in flight returns the existing job's handle instead of taking
+        another channel slot. Pass `dedupe=False` for intentional
+        variations.
+
+        With `pack`, the all-categories batch is sent as permutation
+        prompts of up to `permutation_max_jobs` entries, one /imagine per
+        pack; each category still gets its own job handle.
+        """
         self.logger.info("📥 Message push initiated.")
+        messages = self.build_messages(
+            date=date,
+            category=category,
+            user_prompt=user_prompt,
+            description=description,
+            dedupe=dedupe,
+        )
+        all_categories = not (user_prompt or description or category)
+        pack_size = self.permutation_max_jobs if pack and all_categories else 0
+        return self.enqueue_messages(messages, dedupe=dedupe, pack_size=pack_size)
+
+    def build_messages(
+        self,
+        date: Optional[Union[str, datetime]] = None,
+        category: Optional[str] = None,
+        user_prompt: Optional[str] = None,
+        description: Optional[str] = None,
+        dedupe: bool = True,
+    ) -> list[dict]:
+        """
+        Generate the queue messages for a push without enqueuing them, so
+        prompts can be prepared ahead of time (see `BatchScheduler`).
+
+        With `dedupe`, a message whose job is already queued or in flight
+        reuses that job's prompt instead of generating a new one; it is
+        then coalesced onto the job when enqueued.
+        """
         if user_prompt:
             self.logger.info("🧠 User-provided prompt detected.")
-            message = {
+            try:
+                user_prompt = self.prompt_validator.validate(
+                    user_prompt, generated=False
+                )
+            except PromptRejected as e:
+                self.logger.error(f"❌ User prompt rejected ({e.reason}).")
+                return []
+            return [{
                 "prompt": user_prompt,
                 "category": None,
                 "date_based": False,
                 "user_prompt": True,
                 "description": None,
-            }
+            }]
         elif description:
             self.logger.info("💡 Using OpenAI to generate prompt from description.")
-            prompt = Container.promptEngine.generate_from_description(
-                description, self.logger
-            )
-            if not prompt:
-                self.logger.error("❌ Failed to generate prompt from description.")
-                return
-            self.logger.info(f"➡ Generated Prompt: {prompt}")
             message = {
-                "prompt": prompt,
+                "prompt": None,
                 "category": None,
                 "date_based": False,
                 "user_prompt": False,
                 "description": description,
             }
+
+            def generate() -> Optional[str]:
+                with self.tracer.span("prompt_generation", description=description):
+                    return Container.promptEngine.generate_from_description(
+                        description, self.logger
+                    )
+
+            message["prompt"] = (dedupe and self._inflight_prompt(message)) or (
+                self._validated_prompt(generate, "description")
+            )
+            self._log_validation_stats()
+            if not message["prompt"]:
+                self.logger.error("❌ Failed to generate prompt from description.")
+                return []
+            self.logger.info(f"➡ Generated Prompt: {message['prompt']}")
+            return [message]
         elif category:
             self.logger.info(f"🔍 Generating for category: {category}")
-            prompt = self.generate_prompt(category, self.create_daily_factors(date))
-            message = {
-                "prompt": prompt,
-                "category": category,
+            message = self._daily_message(category, date, dedupe)
+            self._log_validation_stats()
+            return [message] if message else []
+
+        self.logger.info(
+            "📅 No category or prompt given, generating for all default categories."
+        )
+        messages = []
+        for cat in self.DEFAULT_CATEGORIES:
+            self.logger.info(
+                f"\n====================== Generating prompt for category: {cat} ======================\n"
+            )
+            message = self._daily_message(cat, date, dedupe)
+            if message:
+                messages.append(message)
+        self._log_validation_stats()
+        return messages
+
+    def _daily_message(self, category: str,
+                       date: Optional[Union[str, datetime]],
+                       dedupe: bool) -> Optional[dict]:
+        factors = self.create_daily_factors(date)
+        # A scheduled run passes its run time; each run is its own batch
+        run_at = f":{date:%H%M}" if isinstance(date, datetime) else ""
+        message = {
+            "prompt": None,
+            "category": category,
+            "factors_date": factors["date"],
+            "factors_key": f"{factors['date']}:{factors.get('timeOfDay')}{run_at}",
+            "date_based": True,
+            "user_prompt": False,
+            "description": None,
+        }
+        message["prompt"] = (dedupe and self._inflight_prompt(message)) or (
+            self._validated_prompt(
+                lambda: self.generate_prompt(category, factors), category
+            )
+        )
+        return message if message["prompt"] else None
+
+    def _inflight_prompt(self, message: dict) -> Optional[str]:
+        # The prompt of a live job with the same dedupe key, if any
+        key = self._dedupe_key(message)
+        with self._inflight_lock:
+            existing = self._inflight.get(key)
+        if existing is None or existing.done():
+            return None
+        self.logger.info(
+            f"🔗 Job {existing.job_id} is in flight for {key}, "
+            f"skipping prompt generation"
+        )
+        return existing.prompt
+
+    def enqueue_messages(self, messages: list[dict], dedupe: bool = True,
+                         pack_size: int = 0) -> list[Job]:
+        if pack_size < 2:
+            return [self._enqueue(message, dedupe) for message in messages]
+
+        jobs, fresh = [], []
+        for message in messages:
+            job, is_new = self._register(message, dedupe)
+            jobs.append(job)
+            if is_new:
+                fresh.append(message)
+
+        for pack in pack_messages(fresh, pack_size):
+            if len(pack) == 1:
+                self._put(pack[0])
+                continue
+            pack_message = {
+                "prompt": build_pack_prompt(pack),
+                "category": None,
                 "date_based": True,
                 "user_prompt": False,
                 "description": None,
+                "pack": pack,
             }
-        else:
+            pack_message["job"] = Job(pack_message)
             self.logger.info(
-                "📅 No category or prompt given, generating for all default categories."
+                f"📦 Packed {len(pack)} prompts into one permutation prompt"
             )
+            self._put(pack_message)
+        return jobs
+
+    @staticmethod
+    def _dedupe_key(message: dict) -> str:
+        def squash(text: str) -> str:
+            return " ".join(normalize_prompt(text).lower().split())
+
+        # OpenAI output differs run to run, so generated prompts are keyed
+        # by what they were generated from rather than by their text.
+        if message.get("description"):
+            return f"description:{squash(message['description'])}"
+        if message.get("date_based") and message.get("factors_key"):
+            return f"daily:{message['category']}:{message['factors_key']}"
+        return f"prompt:{squash(message['prompt'])}"
 
-            for cat in self.DEFAULT_CATEGORIES:
+    def _enqueue(self, message: dict, dedupe: bool = True) -> Job:
+        job, is_new = self._register(message, dedupe)
+        if is_new:
+            self._put(message)
+        return job
+
+    def _register(self, message: dict, dedupe: bool) -> tuple[Job, bool]:
+        # Returns the message's job and whether it is new (not coalesced)
+        key = self._dedupe_key(message) if dedupe else None
+        with self._inflight_lock:
+            existing = self._inflight.get(key) if key else None
+            if existing and not existing.done():
                 self.logger.info(
-                    f"\n====================== Generating prompt for category: {cat} ======================\n"
+                    f"🔗 Duplicate of job {existing.job_id} coalesced ({key})"
                 )
-                prompt = self.generate_prompt(cat, self.create_daily_factors(date))
-                message = {
-                    "prompt": prompt,
-                    "category": cat,
-                    "date_based": True,
-                    "user_prompt": False,
-                    "description": None,
-                }
-                self.message_queue.put(message)
-            return
+                return existing, False
+            job = Job(message)
+            if key:
+                self._inflight[key] = job
+        message["job"] = job
+        if key:
+            job.add_done_callback(lambda j, key=key: self._forget_inflight(key, j))
+        return job, True
 
+    def _put(self, message: dict):
+        job: Job = message["job"]
+        self.tracer.async_begin("job", job.job_id, category=job.category)
+        job.add_done_callback(lambda j: self.tracer.async_end("job", j.job_id))
         self.message_queue.put(message)
+        self.logger.info(f"🧾 Enqueued job {job.job_id}")
+
+    def _forget_inflight(self, key: str, job: Job):
+        with self._inflight_lock:
+            if self._inflight.get(key) is job:
+                del self._inflight[key]
+
+    def as_completed(self, jobs: Iterable[Job],
+                     timeout: Optional[float] = None) -> Iterator[Job]:
+        """
+        Yield the given jobs as they finish, so callers can post-process
+        each image as soon as it lands instead of waiting for the batch.
+        """
+        return as_completed(jobs, timeout=timeout)
 
     def generate_images(self):
         self.logger.info(
@@ -0,0 +1,62 @@
+# standard library imports
+import re
+from typing import Optional
+
+# Internal Project Module Imports
+from midjourney.adapters.discord.discord_engine import normalize_prompt
+
+# Discord rejects string options longer than this
+MAX_PROMPT_LENGTH = 6000
+_PARAMS_START = re.compile(r"(^|\s)--[a-zA-Z]")
+
+
+def split_params(prompt: str) -> tuple[str, str]:
+    """
+    Split a prompt into its text and its trailing Midjourney parameters,
+    e.g. "a golden tree --ar 9:16" -> ("a golden tree", "--ar 9:16").
+    """
+    prompt = normalize_prompt(prompt)
+    match = _PARAMS_START.search(prompt)
+    if not match:
+        return prompt.strip().rstrip(",."), ""
+    text = prompt[:match.start()].strip().rstrip(",.")
+    params = " ".join(prompt[match.start():].split())
+    return text, params
+
+
+def _escape_option(text: str) -> str:
+    # Commas separate permutation options, braces would nest them
+    return text.replace("{", "(").replace("}", ")").replace(",", "\\,")
+
+
+def build_permutation(texts: list[str], params: str) -> str:
+    options = ", ".join(_escape_option(text) for text in texts)
+    return f"{{{options}}} {params}".strip()
+
+
+def pack_messages(messages: list[dict], max_jobs: int,
+                  max_length: int = MAX_PROMPT_LENGTH) -> list[list[dict]]:
+    """
+    Group messages into packs that can share one permutation prompt:
+    same factors date, same parameters, at most `max_jobs` options and
+    `max_length` characters. Each message gains "pack_text" (its prompt
+    without parameters), used later to match its grid.
+    """
+    groups: dict[tuple[Optional[str], str], list[list[dict]]] = {}
+    for message in messages:
+        text, params = split_params(message["prompt"])
+        message["pack_text"] = text
+        message["pack_params"] = params
+        packs = groups.setdefault((message.get("factors_date"), params), [[]])
+        current = packs[-1]
+        candidate = [m["pack_text"] for m in current] + [text]
+        if current and (len(candidate) > max_jobs
+                        or len(build_permutation(candidate, params)) > max_length):
+            current = []
+            packs.append(current)
+        current.append(message)
+    return [pack for packs in groups.values() for pack in packs if pack]
+
+
+def build_pack_prompt(pack: list[dict]) -> str:
+    return build_permutation([m["pack_text"] for m in pack], pack[0]["pack_params"])
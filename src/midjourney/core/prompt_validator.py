@@ -0,0 +1,158 @@
+# standard library imports
+import re
+import threading
+from collections import Counter
+from typing import Optional
+
+# Internal Project Module Imports
+from midjourney.core.permutation import MAX_PROMPT_LENGTH, split_params
+
+REQUIRED_ASPECT_RATIO = "9:16"
+# Any lead-in ending in "prompt:", e.g. "Here's a prompt:" or "/imagine prompt:"
+_LABEL_PREFIX = re.compile(r"^[^:]*?\bprompt\s*:\s*", re.IGNORECASE)
+# Error strings and model refusals, matched only at the start of the text
+_REFUSAL = re.compile(
+    r"^(?:prompt generation failed"
+    r"|(?:i'?m|i am) (?:sorry|unable)"
+    r"|i (?:cannot|can'?t|won'?t) (?:help|assist|create|generate|provide|comply|fulfill)"
+    r"|as an ai\b)",
+    re.IGNORECASE,
+)
+# Number of values each Midjourney parameter takes; None means any
+# number (lists such as --no, reference URLs, unknown parameters).
+PARAM_VALUES = {
+    "ar": 1, "aspect": 1, "v": 1, "version": 1, "s": 1, "stylize": 1,
+    "c": 1, "chaos": 1, "q": 1, "quality": 1, "w": 1, "weird": 1,
+    "seed": 1, "stop": 1, "iw": 1, "sw": 1, "cw": 1, "style": 1,
+    "r": 1, "repeat": 1,
+    "tile": 0, "relax": 0, "fast": 0, "turbo": 0, "draft": 0,
+}
+# Parameters whose single value is optional, e.g. "--niji" or "--niji 6"
+_OPTIONAL_NUMBER = {"niji"}
+
+
+class PromptRejected(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class PromptValidator:
+    """
+    Normalizes prompts before they are queued and rejects ones Midjourney
+    would refuse or render unusably, so they never hold a channel lock.
+
+    Repairs: labels such as "Prompt:", markdown and smart/straight quotes,
+    whitespace and trailing periods, missing or duplicate --ar (generated
+    prompts are forced to --ar 9:16) and, for generated prompts, text over
+    `max_length` (cut at a word boundary).
+    Words stranded after a parameter's values (e.g. "--v 6 glowing
+    lights") are moved back into the text.
+    Rejections: empty text, generated prompts that start with an error or
+    refusal, and prompts over Discord's hard option limit.
+
+    `stats` counts each repair and rejection reason.
+    """
+
+    def __init__(self, max_length: int = 350,
+                 hard_max_length: int = MAX_PROMPT_LENGTH) -> None:
+        self.max_length = max_length
+        self.hard_max_length = hard_max_length
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def validate(self, prompt: Optional[str], generated: bool = True) -> str:
+        fixes: list[str] = []
+        try:
+            cleaned = self._normalize(prompt or "", fixes, generated)
+        except PromptRejected as e:
+            self._count(["rejected:" + e.reason])
+            raise
+        self._count(fixes + ["accepted"])
+        return cleaned
+
+    def report(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def _count(self, keys: list[str]) -> None:
+        with self._lock:
+            self.stats.update(keys)
+
+    def _normalize(self, prompt: str, fixes: list[str], generated: bool) -> str:
+        text = " ".join(prompt.split())
+        if text != prompt:
+            fixes.append("whitespace")
+
+        unlabeled = _LABEL_PREFIX.sub("", text)
+        if unlabeled != text:
+            fixes.append("label")
+        unquoted = unlabeled.replace("**", "").replace("`", "")
+        unquoted = unquoted.strip().strip('"\'“”‘’').strip()
+        if unquoted != unlabeled:
+            fixes.append("quotes")
+        # User prompts are sent as written; only model output can refuse
+        if generated and _REFUSAL.match(unquoted):
+            raise PromptRejected("error_or_refusal")
+
+        text, params = split_params(unquoted)
+        text = text.strip('"\'“”‘’ ').rstrip(".,;:")
+        params, leftover = self._fix_params(params, fixes, generated)
+        if leftover:
+            text = f"{text} {leftover}".strip()
+        if not text:
+            raise PromptRejected("empty")
+
+        limit = self.max_length if generated else self.hard_max_length
+        budget = limit - len(params) - 1
+        if len(text) > budget:
+            if not generated or budget <= 0:
+                raise PromptRejected("too_long")
+            text = text[:budget].rsplit(" ", 1)[0].rstrip(" ,.;:")
+            fixes.append("truncated")
+        return f"{text} {params}"
+
+    @staticmethod
+    def _fix_params(params: str, fixes: list[str],
+                    generated: bool) -> tuple[str, str]:
+        # Returns the repaired parameter string and any words stranded
+        # after a parameter's values, which belong back in the prompt text
+        parsed: dict[str, list[str]] = {}
+        leftover: list[str] = []
+        seen_ar = 0
+        current: Optional[str] = None
+        for token in params.split():
+            if token.startswith("--"):
+                current = token[2:].lower()
+                if current in ("ar", "aspect"):
+                    current = "ar"
+                    seen_ar += 1
+                parsed[current] = []
+                continue
+            values = parsed[current]
+            if current in _OPTIONAL_NUMBER:
+                expected = 0 if values or not token.replace(".", "").isdigit() else 1
+            else:
+                expected = PARAM_VALUES.get(current)
+            if expected is None or len(values) < expected:
+                values.append(token)
+            else:
+                leftover.append(token)
+
+        if seen_ar > 1:
+            fixes.append("duplicate_ar")
+        if "ar" not in parsed or not parsed["ar"]:
+            fixes.append("missing_ar")
+            parsed["ar"] = [REQUIRED_ASPECT_RATIO]
+        elif generated and parsed["ar"] != [REQUIRED_ASPECT_RATIO]:
+            fixes.append("wrong_ar")
+            parsed["ar"] = [REQUIRED_ASPECT_RATIO]
+        if leftover:
+            fixes.append("text_after_params")
+
+        # --ar goes last, matching what the prompt engines ask for
+        ordered = [name for name in parsed if name != "ar"] + ["ar"]
+        rendered = " ".join(
+            " ".join([f"--{name}"] + parsed[name]) for name in ordered
+        )
+        return rendered, " ".join(leftover)
@@ -0,0 +1,23 @@
+# standard library imports
+from typing import Optional
+
+
+class RetryPolicy:
+    """
+    How often a failed pipeline stage may be retried and how long to back
+    off between attempts (exponential, capped at `max_delay`).
+    """
+
+    def __init__(self, max_attempts: int = 1, backoff: float = 0.0,
+                 multiplier: float = 2.0, max_delay: float = 300.0) -> None:
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+
+    def should_retry(self, attempts: int) -> bool:
+        return attempts < self.max_attempts
+
+    def delay(self, attempts: int, retry_after: Optional[float] = None) -> float:
+        delay = self.backoff * (self.multiplier ** max(attempts - 1, 0))
+        return min(max(delay, retry_after or 0.0), self.max_delay)
@@ -0,0 +1,131 @@
+# standard library imports
+import threading
+from datetime import datetime, timedelta, time as time_type
+from typing import Callable, Optional
+
+# Internal Project Module Imports
+from midjourney.utils.logger.logger import Logger
+
+
+class BatchScheduler:
+    """
+    Runs batches at configured times of day. Each run's prompts are
+    generated `lookahead` ahead of the trigger time, using the daily
+    factors for the trigger time itself, so at trigger time the jobs go
+    straight to the Discord queue.
+
+    Run times are "HH:MM" strings or one of the `timeOfDay` names from
+    `DefaultDailyFactors` ("Dawn", "Morning", ...), which map to the start
+    of that window so the factors match the name.
+
+    `dedupe` and `pack` behave as in `ImageGenerator.message_push`.
+    `now` and `sleep` can be injected to drive the scheduler in tests;
+    by default it waits in real time and `stop()` interrupts the wait.
+    """
+    TIME_OF_DAY_STARTS = {
+        "dawn": time_type(5, 0),
+        "morning": time_type(7, 0),
+        "noon": time_type(12, 0),
+        "afternoon": time_type(14, 0),
+        "dusk": time_type(18, 0),
+        "night": time_type(20, 0),
+    }
+
+    def __init__(self, generator, run_times: list[str],
+                 lookahead: timedelta = timedelta(minutes=30),
+                 category: Optional[str] = None,
+                 on_batch: Optional[Callable[[list], None]] = None,
+                 logger: Optional[Logger] = None,
+                 dedupe: bool = True,
+                 pack: bool = False,
+                 now: Callable[[], datetime] = datetime.now,
+                 sleep: Optional[Callable[[float], object]] = None) -> None:
+        if not run_times:
+            raise ValueError("At least one run time is required")
+        self.generator = generator
+        self.run_times = sorted(self.parse_run_time(t) for t in run_times)
+        self.lookahead = lookahead
+        self.category = category
+        self.on_batch = on_batch
+        self.dedupe = dedupe
+        # Only the all-categories batch is packed
+        self.pack_size = (
+            generator.permutation_max_jobs if pack and not category else 0
+        )
+        self.logger = logger or generator.logger
+        self._stop_event = threading.Event()
+        self.now = now
+        self._sleep = sleep or self._stop_event.wait
+
+    @classmethod
+    def parse_run_time(cls, value: str) -> time_type:
+        value = value.strip()
+        if value.lower() in cls.TIME_OF_DAY_STARTS:
+            return cls.TIME_OF_DAY_STARTS[value.lower()]
+        try:
+            return datetime.strptime(value, "%H:%M").time()
+        except ValueError:
+            raise ValueError(
+                f"Invalid run time {value!r}: expected HH:MM or a time of day name"
+            )
+
+    def next_run(self, after: datetime) -> datetime:
+        """
+        Return the first configured run time strictly after `after`.
+        """
+        for day_offset in (0, 1):
+            day = (after + timedelta(days=day_offset)).date()
+            for run_time in self.run_times:
+                candidate = datetime.combine(day, run_time)
+                if candidate > after:
+                    return candidate
+        raise RuntimeError("No run time found")  # unreachable
+
+    def run(self, max_runs: Optional[int] = None) -> None:
+        runs = 0
+        last_target = self.now()
+        while not self._stop_event.is_set():
+            if max_runs is not None and runs >= max_runs:
+                break
+            target = self.next_run(last_target)
+            last_target = target
+
+            prepare_at = target - self.lookahead
+            self.logger.info(
+                f"⏰ [SCHEDULE] Next run at {target:%Y-%m-%d %H:%M}, "
+                f"preparing prompts at {prepare_at:%Y-%m-%d %H:%M}"
+            )
+            if not self._wait_until(prepare_at):
+                break
+
+            self.logger.info(f"🧠 [SCHEDULE] Pre-generating prompts for {target}")
+            try:
+                messages = self.generator.build_messages(
+                    date=target, category=self.category, dedupe=self.dedupe
+                )
+            except Exception as e:
+                self.logger.error(f"❌ [SCHEDULE] Prompt generation failed: {e}")
+                continue
+
+            if not self._wait_until(target):
+                break
+
+            jobs = self.generator.enqueue_messages(
+                messages, dedupe=self.dedupe, pack_size=self.pack_size
+            )
+            self.logger.info(f"🚀 [SCHEDULE] Enqueued {len(jobs)} jobs for {target}")
+            runs += 1
+            if self.on_batch:
+                self.on_batch(jobs)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _wait_until(self, when: datetime) -> bool:
+        # Returns False if the scheduler was stopped while waiting
+        while not self._stop_event.is_set():
+            remaining = (when - self.now()).total_seconds()
+            if remaining <= 0:
+                return True
+            self._sleep(min(remaining, 60))
+        return False
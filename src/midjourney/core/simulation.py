@@ -0,0 +1,131 @@
+# standard library imports
+import logging
+import time
+import concurrent.futures
+from typing import Optional
+
+# Internal Project Module Imports
+from midjourney.config.container import Container
+from midjourney.core.main import ImageGenerator
+from midjourney.utils.clock.virtual_clock import VirtualClock
+from midjourney.utils.logger.app_logger import AppLogger
+from midjourney.utils.tracing.tracer import Tracer
+from midjourney.adapters.factors.daily_factors import DefaultDailyFactors
+from midjourney.adapters.simulation.sim_discord_engine import SimulatedDiscordEngine
+from midjourney.adapters.simulation.sim_prompt_engine import SimulatedPromptEngine
+
+
+def _percentile(values: list[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return round(ordered[index], 1)
+
+
+def run_simulation(num_jobs: int = 100,
+                   num_channels: int = 2,
+                   num_workers: int = 2,
+                   seed: int = 0,
+                   poll_interval: float = 30,
+                   engine_options: Optional[dict] = None,
+                   prompt_options: Optional[dict] = None,
+                   pack: bool = False,
+                   log_level: int = logging.CRITICAL) -> dict:
+    """
+    Run `num_jobs` category jobs through the real ImageGenerator worker,
+    routing and retry code against simulated Discord channels and a
+    simulated OpenAI engine on a virtual clock, and return a report of
+    virtual-time latency and throughput. With `pack`, jobs are pushed as
+    all-categories batches packed into permutation prompts, so the
+    number of jobs attempted rounds up to whole batches. A push whose
+    prompt generation fails counts all its jobs in "jobs_dropped".
+
+    This replaces the Container's shared components, so it is meant for
+    standalone runs (see bin/simulate.py), not inside a live bot.
+    """
+    clock = VirtualClock()
+    Container.config = {}
+    Container.logger = AppLogger(name="midjour_sim", level=log_level)
+    Container.daily_factors = DefaultDailyFactors()
+    Container.promptEngine = SimulatedPromptEngine(
+        clock, seed=seed, **(prompt_options or {})
+    )
+    Container.post_processor = None
+    Container.tracer = Tracer()
+
+    engines = {
+        f"sim{i + 1}": SimulatedDiscordEngine(
+            channel_id=f"sim-channel-{i + 1}",
+            clock=clock,
+            seed=seed * 1000 + i,
+            logger=Container.logger,
+            poll_interval=poll_interval,
+            **(engine_options or {}),
+        )
+        for i in range(num_channels)
+    }
+
+    wall_started = time.perf_counter()
+    # Hold virtual time while the driver is busy; its own prompt
+    # generation sleeps still let the clock advance.
+    clock.register()
+    generator = ImageGenerator(engines=engines, clock=clock,
+                               num_workers=num_workers)
+    generator.results_log_path = None
+
+    enqueued_at: dict[str, float] = {}
+    finished_at: dict[str, float] = {}
+    jobs = []
+    prompt_failures = 0
+    # Jobs whose push failed or whose prompt was rejected
+    dropped = 0
+    try:
+        batch = len(ImageGenerator.DEFAULT_CATEGORIES) if pack else 1
+        for i in range(0, num_jobs, batch):
+            category = None if pack else ImageGenerator.DEFAULT_CATEGORIES[
+                i % len(ImageGenerator.DEFAULT_CATEGORIES)
+            ]
+            try:
+                pushed = generator.message_push(category=category,
+                                                dedupe=False, pack=pack)
+            except RuntimeError:
+                prompt_failures += 1
+                dropped += batch
+                continue
+            dropped += batch - len(pushed)
+            for job in pushed:
+                enqueued_at[job.job_id] = clock.now()
+                job.add_done_callback(
+                    lambda j: finished_at.__setitem__(j.job_id, clock.now())
+                )
+                jobs.append(job)
+    finally:
+        clock.unregister()
+
+    concurrent.futures.wait([job.future for job in jobs])
+    generator.shutdown()
+
+    succeeded = [job for job in jobs if job.exception() is None]
+    latencies = [finished_at[j.job_id] - enqueued_at[j.job_id] for j in succeeded]
+    makespan = (max(finished_at.values()) - min(enqueued_at.values())) if jobs else 0.0
+    return {
+        "jobs_requested": num_jobs,
+        "jobs_enqueued": len(jobs),
+        "jobs_dropped": dropped,
+        "channels": num_channels,
+        "workers": num_workers,
+        "succeeded": len(succeeded),
+        "failed": len(jobs) - len(succeeded),
+        "prompt_failures": prompt_failures,
+        "prompt_validation": generator.prompt_validator.report(),
+        "virtual_makespan_s": round(makespan, 1),
+        "throughput_per_hour": round(len(succeeded) / makespan * 3600, 1) if makespan else None,
+        "latency_p50_s": _percentile(latencies, 50),
+        "latency_p95_s": _percentile(latencies, 95),
+        "latency_max_s": _percentile(latencies, 100),
+        "discord_interactions": sum(e.interactions for e in engines.values()),
+        "retries": sum(sum(j.attempts.values()) for j in jobs),
+        "channel_health": [h.snapshot() for h in generator.channel_health.values()],
+        "wall_time_s": round(time.perf_counter() - wall_started, 2),
+    }
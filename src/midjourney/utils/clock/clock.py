@@ -0,0 +1,48 @@
+# standard library imports
+import time
+from abc import ABC, abstractmethod
+from queue import Queue
+from typing import Any
+
+
+# abstract class for time sources used by the pipeline
+class Clock(ABC):
+
+    @abstractmethod
+    def now(self) -> float:
+        """
+        Monotonic time in seconds.
+        """
+        pass
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        pass
+
+    @abstractmethod
+    def queue_get(self, queue: Queue, timeout: float) -> Any:
+        """
+        Like `queue.get(timeout=timeout)`, raising `queue.Empty` on timeout.
+        """
+        pass
+
+    def register(self) -> None:
+        """
+        Called by a thread that takes part in the pipeline (a worker)
+        before it starts using the clock.
+        """
+        pass
+
+    def unregister(self) -> None:
+        pass
+
+
+class SystemClock(Clock):
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def queue_get(self, queue: Queue, timeout: float) -> Any:
+        return queue.get(timeout=timeout)
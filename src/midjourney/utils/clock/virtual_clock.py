@@ -0,0 +1,83 @@
+# standard library imports
+import threading
+from queue import Empty, Queue
+from typing import Any
+
+# Internal project module imports
+from midjourney.utils.clock.clock import Clock
+
+
+class VirtualClock(Clock):
+    """
+    Discrete-event clock for simulations. `sleep` never waits on wall
+    time: once every registered thread is asleep, the clock jumps
+    straight to the earliest pending wake-up.
+
+    Threads that drive the pipeline (workers) must call `register()`;
+    a registered thread that is busy holds virtual time still. Sleeps from
+    unregistered threads are honoured but never block an advance.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = start
+        self._cond = threading.Condition()
+        self._participants: set[int] = set()
+        # ident -> deadline for registered threads currently asleep
+        self._sleeping: dict[int, float] = {}
+        # deadlines of unregistered sleepers
+        self._other_deadlines: list[float] = []
+
+    def now(self) -> float:
+        with self._cond:
+            return self._now
+
+    def register(self) -> None:
+        with self._cond:
+            self._participants.add(threading.get_ident())
+
+    def unregister(self) -> None:
+        with self._cond:
+            self._participants.discard(threading.get_ident())
+            self._maybe_advance()
+
+    def sleep(self, seconds: float) -> None:
+        ident = threading.get_ident()
+        with self._cond:
+            deadline = self._now + max(seconds, 0.0)
+            registered = ident in self._participants
+            if registered:
+                self._sleeping[ident] = deadline
+            else:
+                self._other_deadlines.append(deadline)
+            self._maybe_advance()
+            while self._now < deadline:
+                self._cond.wait()
+            if registered:
+                self._sleeping.pop(ident, None)
+            elif deadline in self._other_deadlines:
+                self._other_deadlines.remove(deadline)
+
+    def queue_get(self, queue: Queue, timeout: float) -> Any:
+        try:
+            return queue.get_nowait()
+        except Empty:
+            self.sleep(timeout)
+        return queue.get_nowait()
+
+    def _maybe_advance(self) -> None:
+        # Caller holds self._cond
+        if len(self._sleeping) < len(self._participants):
+            return
+        deadlines = list(self._sleeping.values()) + self._other_deadlines
+        if not deadlines:
+            return
+        target = min(deadlines)
+        if target > self._now:
+            self._now = target
+        # Mark due sleepers awake now, so nobody can advance the clock
+        # again before they have had a chance to run.
+        for ident, deadline in list(self._sleeping.items()):
+            if deadline <= self._now:
+                del self._sleeping[ident]
+        self._other_deadlines = [d for d in self._other_deadlines if d > self._now]
+        self._cond.notify_all()
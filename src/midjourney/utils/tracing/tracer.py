@@ -0,0 +1,138 @@
+# standard library imports
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+# Internal project module imports
+from midjourney.utils.clock.clock import Clock
+
+
+class _NullSpan:
+    # Shared no-op span returned when tracing is disabled
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer: "Tracer", name: str, args: dict) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = self.tracer._now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._emit({
+            "ph": "X",
+            "name": self.name,
+            "ts": self.start,
+            "dur": self.tracer._now() - self.start,
+            "args": self.args,
+        })
+        return False
+
+
+class Tracer:
+    """
+    Records spans in the Chrome trace event format, viewable in Perfetto
+    or chrome://tracing. Spans nest per thread, so each worker shows the
+    tree for the job it is running; each job additionally gets an async
+    slice from enqueue to completion to show time spent queued.
+
+    When constructed without a path the tracer is disabled and `span()`
+    returns a shared no-op context manager. Timestamps come from `clock`
+    when one is given (see `use_clock`), otherwise from perf_counter.
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 clock: Optional[Clock] = None) -> None:
+        self.path = path
+        self.enabled = bool(path)
+        self._events: list[dict] = []
+        self._named_threads: set[int] = set()
+        self._lock = threading.Lock()
+        self.clock = clock
+        self._origin = self._clock_ns()
+        self._pid = os.getpid()
+        if self.enabled:
+            atexit.register(self.save)
+
+    def use_clock(self, clock: Clock) -> None:
+        """
+        Take timestamps from `clock`, e.g. the VirtualClock of a simulated
+        run. Meant to be called before any span is recorded.
+        """
+        with self._lock:
+            self.clock = clock
+            self._origin = self._clock_ns()
+
+    def span(self, name: str, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def async_begin(self, name: str, span_id: str, **args) -> None:
+        if self.enabled:
+            self._emit({"ph": "b", "cat": name, "name": name, "id": span_id,
+                        "ts": self._now(), "args": args})
+
+    def async_end(self, name: str, span_id: str, **args) -> None:
+        if self.enabled:
+            self._emit({"ph": "e", "cat": name, "name": name, "id": span_id,
+                        "ts": self._now(), "args": args})
+
+    def close(self) -> None:
+        """
+        Disable the tracer and drop its save at exit, for a tracer being
+        replaced by another one.
+        """
+        if self.enabled:
+            atexit.unregister(self.save)
+        self.enabled = False
+
+    def save(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            events = list(self._events)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def _clock_ns(self) -> int:
+        if self.clock is None:
+            return time.perf_counter_ns()
+        return int(self.clock.now() * 1_000_000_000)
+
+    def _now(self) -> int:
+        # Microseconds since the tracer was created
+        return (self._clock_ns() - self._origin) // 1000
+
+    def _emit(self, event: dict) -> None:
+        thread = threading.current_thread()
+        event["pid"] = self._pid
+        event["tid"] = thread.ident
+        with self._lock:
+            if thread.ident not in self._named_threads:
+                self._named_threads.add(thread.ident)
+                self._events.append({
+                    "ph": "M", "name": "thread_name", "pid": self._pid,
+                    "tid": thread.ident, "args": {"name": thread.name},
+                })
+            self._events.append(event)
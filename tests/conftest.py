@@ -0,0 +1,82 @@
+import logging
+
+import pytest
+
+from midjourney.config.container import Container
+from midjourney.core.main import ImageGenerator
+from midjourney.utils.clock.virtual_clock import VirtualClock
+from midjourney.utils.logger.app_logger import AppLogger
+from midjourney.utils.tracing.tracer import Tracer
+from midjourney.adapters.factors.daily_factors import DefaultDailyFactors
+from midjourney.adapters.prompts.template_prompt_engine import TemplatePromptEngine
+from midjourney.adapters.simulation.sim_discord_engine import SimulatedDiscordEngine
+
+NO_FAILURES = {
+    "send_failure_rate": 0.0,
+    "grid_lost_rate": 0.0,
+    "click_failure_rate": 0.0,
+    "upscale_lost_rate": 0.0,
+    "download_failure_rate": 0.0,
+}
+
+
+@pytest.fixture
+def container():
+    """
+    Populate the Container with offline components so ImageGenerator
+    does not read .env or call OpenAI; restores the previous state.
+    """
+    saved = {name: getattr(Container, name) for name in (
+        "config", "logger", "daily_factors", "promptEngine",
+        "post_processor", "tracer",
+    )}
+    Container.config = {}
+    Container.logger = AppLogger(name="midjour_test", level=logging.CRITICAL)
+    Container.daily_factors = DefaultDailyFactors()
+    Container.promptEngine = TemplatePromptEngine()
+    Container.post_processor = None
+    Container.tracer = Tracer()
+    yield Container
+    for name, value in saved.items():
+        setattr(Container, name, value)
+
+
+@pytest.fixture
+def clock():
+    return VirtualClock()
+
+
+@pytest.fixture
+def make_generator(container, clock):
+    """
+    Build an ImageGenerator over simulated channels on a virtual clock.
+    Defaults to no worker threads, for calling its methods directly.
+    """
+    generators = []
+
+    def make(num_channels=1, num_workers=0, engine_options=None, **kwargs):
+        engines = {
+            f"sim{i + 1}": SimulatedDiscordEngine(
+                channel_id=f"sim-channel-{i + 1}",
+                clock=clock,
+                seed=i,
+                logger=container.logger,
+                poll_interval=30,
+                **{**NO_FAILURES, **(engine_options or {})},
+            )
+            for i in range(num_channels)
+        }
+        generator = ImageGenerator(engines=engines, clock=clock,
+                                   num_workers=num_workers, **kwargs)
+        generator.results_log_path = None
+        generators.append(generator)
+        return generator
+
+    yield make
+    for generator in generators:
+        if not generator.worker_threads:
+            # Nothing will consume what the test enqueued
+            while not generator.message_queue.empty():
+                generator.message_queue.get_nowait()
+                generator.message_queue.task_done()
+        generator.shutdown()
@@ -0,0 +1,124 @@
+import pytest
+
+from midjourney.core.channel_health import ChannelHealth
+from midjourney.core.job import Job
+from midjourney.adapters.discord.discord_engine import (
+    DiscordRateLimited,
+    StageFailed,
+)
+
+
+def test_success_updates_ewma_latency():
+    health = ChannelHealth("c", alpha=0.5, initial_latency=100.0)
+
+    health.record_success(200.0)
+
+    assert health.ewma_latency == 150.0
+    assert health.state == ChannelHealth.CLOSED
+
+
+def test_opens_after_consecutive_failures_and_recovers_via_probe():
+    health = ChannelHealth("c", failure_threshold=3, cooldown=60.0)
+
+    for _ in range(2):
+        health.record_failure(now=0.0)
+        assert health.state == ChannelHealth.CLOSED
+    health.record_failure(now=0.0)
+
+    assert health.state == ChannelHealth.OPEN
+    assert not health.try_acquire(now=59.0)
+    # Cool-down over: exactly one probe is let through
+    assert health.try_acquire(now=60.0)
+    assert health.state == ChannelHealth.HALF_OPEN
+    assert not health.try_acquire(now=60.0)
+
+    health.record_success(10.0)
+    assert health.state == ChannelHealth.CLOSED
+    assert health.try_acquire(now=61.0)
+
+
+def test_failed_probe_reopens():
+    health = ChannelHealth("c", failure_threshold=1, cooldown=60.0)
+    health.record_failure(now=0.0)
+    assert health.try_acquire(now=60.0)
+
+    health.record_failure(now=60.0)
+
+    assert health.state == ChannelHealth.OPEN
+    assert not health.try_acquire(now=100.0)
+    assert health.try_acquire(now=120.0)
+
+
+def test_rate_limit_opens_for_retry_after():
+    health = ChannelHealth("c", cooldown=300.0)
+
+    health.record_failure(retry_after=1.0, now=0.0)
+
+    assert health.state == ChannelHealth.OPEN
+    assert not health.try_acquire(now=0.5)
+    assert health.try_acquire(now=1.0)
+
+
+def test_long_rate_limit_outlasts_cooldown():
+    health = ChannelHealth("c", cooldown=60.0)
+
+    health.record_failure(retry_after=600.0, now=0.0)
+
+    assert not health.try_acquire(now=599.0)
+    assert health.try_acquire(now=600.0)
+
+
+def test_repeated_rate_limits_trip_the_full_cooldown():
+    health = ChannelHealth("c", failure_threshold=3, cooldown=300.0)
+
+    for now in (0.0, 2.0, 4.0):
+        health.record_failure(retry_after=1.0, now=now)
+
+    assert not health.try_acquire(now=300.0)
+    assert health.try_acquire(now=304.0)
+
+
+def test_expected_completion_penalizes_errors():
+    healthy = ChannelHealth("a", initial_latency=100.0)
+    flaky = ChannelHealth("b", initial_latency=100.0, failure_threshold=99)
+    flaky.record_failure(now=0.0)
+
+    assert flaky.expected_completion() > healthy.expected_completion()
+
+
+def test_rate_limited_retry_opens_circuit_immediately(make_generator):
+    generator = make_generator()
+    job = Job({"prompt": "a tree --ar 9:16"})
+    error = StageFailed("send", DiscordRateLimited("429", retry_after=30.0))
+
+    generator._wait_before_retry("sim1", job, error)
+
+    health = generator.channel_health["sim1"]
+    assert health.state == ChannelHealth.OPEN
+    assert job.attempts == {"send": 1}
+
+
+def test_pack_latency_is_recorded_per_job(make_generator, clock):
+    generator = make_generator()
+    health = generator.channel_health["sim1"]
+    health.alpha = 1.0
+    clock.sleep(400.0)
+
+    generator._record_engine_outcome("sim1", 0.0, jobs=4)
+
+    assert health.ewma_latency == pytest.approx(100.0)
+
+
+def test_poll_rate_limit_reaches_retry_logic(make_generator):
+    generator = make_generator()
+    engine = generator.engines["sim1"][0]
+
+    def rate_limited():
+        raise DiscordRateLimited("429", retry_after=5.0)
+
+    engine._get_messages = rate_limited
+    with pytest.raises(StageFailed) as info:
+        engine.generate_image("a tree --ar 9:16", {})
+
+    assert info.value.stage == "grid"
+    assert info.value.retry_after == 5.0
@@ -0,0 +1,109 @@
+import logging
+
+import pytest
+
+from midjourney.adapters.discord.discord_engine import (
+    DiscordEngine,
+    message_is_newer,
+    normalize_prompt,
+    prompt_match_text,
+    prompt_matches,
+    snowflake_at,
+)
+from midjourney.adapters.simulation.fake_discord_api import FakeDiscordAPI
+
+PROMPTS = ["a golden owl on a scroll --ar 9:16",
+           "a jade dragon over the sea --ar 9:16"]
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # Downloads land in ./images
+    monkeypatch.chdir(tmp_path)
+    api = FakeDiscordAPI(grid_delay=0.2, upscale_delay=0.05).start()
+    yield api
+    api.stop()
+
+
+def _engine(api, **kwargs):
+    return DiscordEngine(
+        discord_token="token",
+        application_id="app",
+        guild_id="guild",
+        channel_id="channel",
+        version="1",
+        command_id="cmd",
+        logger=logging.getLogger("test_discord_engine"),
+        poll_interval=0.05,
+        base_url=api.base_url,
+        **kwargs,
+    )
+
+
+def _run(engine, prompt):
+    checkpoint = {}
+    try:
+        engine.generate_image(prompt, checkpoint)
+    finally:
+        engine.close_job_thread(checkpoint)
+    return checkpoint
+
+
+def test_prompt_match_text_drops_params_and_urls():
+    assert prompt_match_text('"https://x.io/a.png a golden owl. --ar 9:16"') == "a golden owl"
+    assert prompt_matches("**A golden owl --ar 9:16** - <@1> (fast)", "a golden owl")
+    assert normalize_prompt(' "a tree." ') == "a tree"
+
+
+def test_jobs_sharing_a_channel_use_their_own_messages(api):
+    engine = _engine(api)
+
+    first, second = (_run(engine, prompt) for prompt in PROMPTS)
+
+    assert first["message_id"] != second["message_id"]
+    assert first["upscale_url"] != second["upscale_url"]
+    assert second["match"] == "a jade dragon over the sea"
+    assert {limit for _, limit in api.polls} == {50}
+    assert {channel for channel, _ in api.polls} == {"channel"}
+    assert api.threads == {}
+
+
+@pytest.mark.parametrize("cleanup", ["archive", "delete"])
+def test_each_job_runs_in_its_own_thread(api, cleanup):
+    engine = _engine(api, use_threads=True, thread_cleanup=cleanup)
+
+    first, second = (_run(engine, prompt) for prompt in PROMPTS)
+
+    assert first["message_id"] != second["message_id"]
+    assert "thread_id" not in first
+    assert len(api.threads) == 2
+    assert all(t["parent_id"] == "channel" for t in api.threads.values())
+    assert {channel for channel, _ in api.polls} == set(api.threads)
+    assert {limit for _, limit in api.polls} == {10}
+    if cleanup == "archive":
+        assert all(t["archived"] and not t["deleted"] for t in api.threads.values())
+    else:
+        assert all(t["deleted"] for t in api.threads.values())
+    assert engine._active_channel_id == "channel"
+
+
+def test_same_prompt_twice_uses_the_new_messages(api):
+    engine = _engine(api)
+
+    first, second = (_run(engine, PROMPTS[0]) for _ in range(2))
+
+    assert first["message_id"] != second["message_id"]
+    assert first["upscale_url"] != second["upscale_url"]
+    assert int(second["message_id"]) > second["after_id"] > int(first["message_id"])
+    # Each job clicked its own grid
+    clicked = [m for m in api.channels["channel"] if "components" not in m]
+    assert len(clicked) == 2
+
+
+def test_message_is_newer_than_bound():
+    bound = snowflake_at(1_700_000_000.0)
+
+    assert message_is_newer({"id": str(bound + 1)}, bound)
+    assert not message_is_newer({"id": str(bound - 1)}, bound)
+    assert message_is_newer({"id": "grid-abc"}, bound)
+    assert message_is_newer({"id": "1"}, None)
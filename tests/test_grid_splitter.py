@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from midjourney.adapters.images.grid_splitter import split_grid
+
+
+def _grid(path):
+    grid = Image.new("RGB", (4, 6))
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0)]
+    for (x, y), color in zip([(0, 0), (2, 0), (0, 3), (2, 3)], colors):
+        grid.paste(color, (x, y, x + 2, y + 3))
+    grid.save(path)
+    return colors
+
+
+def test_split_grid_returns_quadrants_in_upscale_order(tmp_path):
+    colors = _grid(tmp_path / "grid.png")
+
+    paths = split_grid(str(tmp_path / "grid.png"))
+
+    assert [os.path.basename(p) for p in paths] == [
+        "grid_U1.png", "grid_U2.png", "grid_U3.png", "grid_U4.png"
+    ]
+    for path, color in zip(paths, colors):
+        with Image.open(path) as quadrant:
+            assert quadrant.size == (2, 3)
+            assert quadrant.getpixel((0, 0)) == color
+
+
+def test_split_grid_path_without_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _grid("g.png")
+
+    paths = split_grid("g.png")
+
+    assert paths == [os.path.join(".", f"g_U{i}.png") for i in range(1, 5)]
+    assert all(os.path.exists(p) for p in paths)
@@ -0,0 +1,71 @@
+from midjourney.core.job import as_completed
+from midjourney.core.main import ImageGenerator
+from midjourney.core.permutation import (
+    build_pack_prompt,
+    build_permutation,
+    pack_messages,
+    split_params,
+)
+
+
+def _message(prompt, date="2026-01-01"):
+    return {"prompt": prompt, "factors_date": date}
+
+
+def test_split_params():
+    assert split_params('"A golden tree, glowing. --ar 9:16  --v 6"') == (
+        "A golden tree, glowing", "--ar 9:16 --v 6"
+    )
+    assert split_params("a tree") == ("a tree", "")
+
+
+def test_build_permutation_escapes_option_separators():
+    prompt = build_permutation(["a tree, glowing", "an {owl}"], "--ar 9:16")
+
+    assert prompt == "{a tree\\, glowing, an (owl)} --ar 9:16"
+
+
+def test_pack_messages_respects_max_jobs():
+    messages = [_message(f"subject {i} --ar 9:16") for i in range(5)]
+
+    packs = pack_messages(messages, max_jobs=2)
+
+    assert [len(p) for p in packs] == [2, 2, 1]
+    assert build_pack_prompt(packs[0]) == "{subject 0, subject 1} --ar 9:16"
+    assert messages[4]["pack_text"] == "subject 4"
+
+
+def test_pack_messages_groups_by_params_and_date():
+    messages = [
+        _message("a --ar 9:16"),
+        _message("b --ar 2:3"),
+        _message("c --ar 9:16", date="2026-01-02"),
+        _message("d --ar 9:16"),
+    ]
+
+    packs = pack_messages(messages, max_jobs=4)
+
+    assert [[m["pack_text"] for m in p] for p in packs] == [["a", "d"], ["b"], ["c"]]
+
+
+def test_pack_messages_respects_max_length():
+    messages = [_message(f"{'x' * 20} {i} --ar 9:16") for i in range(3)]
+
+    packs = pack_messages(messages, max_jobs=10, max_length=60)
+
+    assert [len(p) for p in packs] == [2, 1]
+    assert all(len(build_pack_prompt(p)) <= 60 for p in packs)
+
+
+def test_packed_batch_finishes_every_category(make_generator):
+    generator = make_generator(num_channels=2, num_workers=2)
+
+    jobs = generator.message_push(date="2026-01-01", pack=True)
+
+    assert len(jobs) == len(ImageGenerator.DEFAULT_CATEGORIES)
+    for job in as_completed(jobs, timeout=30):
+        assert job.result()["category"] == job.category
+    engines = [engine for engine, _ in generator.engines.values()]
+    # One /imagine per pack of 4 plus one upscale click per job
+    assert sum(e.interactions for e in engines) == 3 + len(jobs)
+
@@ -0,0 +1,127 @@
+import os
+from concurrent.futures import Future
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from midjourney.core.job import Job
+from midjourney.adapters.images.post_processor import (
+    ImagePostProcessor,
+    parse_variants,
+    render_all,
+    render_variants,
+)
+
+RED, GREEN, BLUE = (255, 0, 0), (0, 255, 0), (0, 0, 255)
+
+
+def _striped(path, width=200, height=400):
+    # Top and bottom quarters red/blue, middle half green
+    image = Image.new("RGB", (width, height), GREEN)
+    image.paste(RED, (0, 0, width, height // 4))
+    image.paste(BLUE, (0, 3 * height // 4, width, height))
+    image.save(path)
+    return str(path)
+
+
+def test_parse_variants():
+    assert parse_variants("thumb:270x480:webp, phone:1080x1920:JPEG:70,") == [
+        {"name": "thumb", "width": 270, "height": 480, "format": "webp", "quality": 85},
+        {"name": "phone", "width": 1080, "height": 1920, "format": "jpeg", "quality": 70},
+    ]
+
+
+@pytest.mark.parametrize("spec", ["thumb:270x480", "a:1x1:png:1:extra", "a:1x1:gif", "a:wide:png"])
+def test_parse_variants_rejects_bad_entries(spec):
+    with pytest.raises(ValueError):
+        parse_variants(spec)
+
+
+def test_render_variants_center_crops_and_resizes(tmp_path):
+    source = _striped(tmp_path / "img.png")
+    variants = parse_variants("square:50x50:png,tall:50x100:jpeg,thumb:20x40:webp")
+
+    derivatives = render_variants(source, variants, str(tmp_path / "out"))
+
+    by_name = {d["name"]: d for d in derivatives}
+    assert [os.path.basename(d["path"]) for d in derivatives] == [
+        "img_square.png", "img_tall.jpg", "img_thumb.webp"
+    ]
+    with Image.open(by_name["square"]["path"]) as square:
+        # A centered square of a 1:2 image is all middle stripe
+        assert square.size == (50, 50)
+        assert square.getpixel((0, 0)) == GREEN
+        assert square.getpixel((49, 49)) == GREEN
+    with Image.open(by_name["tall"]["path"]) as tall:
+        assert (tall.format, tall.size) == ("JPEG", (50, 100))
+    with Image.open(by_name["thumb"]["path"]) as thumb:
+        assert (thumb.format, thumb.size) == ("WEBP", (20, 40))
+
+
+def test_render_all_records_sources(tmp_path):
+    sources = [_striped(tmp_path / f"u{i}.png") for i in (1, 2)]
+
+    derivatives = render_all(sources, parse_variants("t:10x20:png"), str(tmp_path))
+
+    assert [d["source"] for d in derivatives] == sources
+
+
+def test_process_pool_renders_derivatives(tmp_path):
+    source = _striped(tmp_path / "img.png")
+    processor = ImagePostProcessor(parse_variants("t:10x20:png"),
+                                   output_dir=str(tmp_path / "out"), max_workers=1)
+    try:
+        derivatives = processor.submit([source]).result(timeout=60)
+    finally:
+        processor.shutdown()
+
+    assert os.path.exists(derivatives[0]["path"])
+
+
+class ManualPostProcessor:
+    # Hands back futures the test resolves itself
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, image_paths):
+        future = Future()
+        self.futures.append((image_paths, future))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def _finish(generator, container):
+    container.post_processor = ManualPostProcessor()
+    engine = generator.engines["sim1"][0]
+    job = Job({"prompt": "a koi --ar 9:16", "category": "luck", "date_based": True,
+               "user_prompt": False, "description": None})
+    done = []
+    generator._finish_job(engine, job, job.message, "images/koi.png",
+                          lambda: done.append(True))
+    return job, container.post_processor.futures, done
+
+
+def test_job_resolves_after_derivatives(make_generator, container):
+    job, futures, done = _finish(make_generator(), container)
+
+    assert [paths for paths, _ in futures] == [["images/koi.png"]]
+    assert not job.done() and not done
+
+    futures[0][1].set_result([{"name": "t", "path": "images/koi_t.png"}])
+
+    assert job.result(timeout=1)["derivatives"] == [{"name": "t", "path": "images/koi_t.png"}]
+    assert done == [True]
+
+
+def test_pool_failure_still_completes_job(make_generator, container):
+    job, futures, done = _finish(make_generator(), container)
+
+    futures[0][1].set_exception(RuntimeError("worker died"))
+
+    result = job.result(timeout=1)
+    assert result["derivatives"] == []
+    assert result["post_process_error"] == "worker died"
+    assert done == [True]
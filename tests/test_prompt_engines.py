@@ -0,0 +1,77 @@
+import time
+from datetime import datetime
+
+from midjourney.adapters.factors.daily_factors import DefaultDailyFactors
+from midjourney.adapters.prompts.hedged_prompt_engine import HedgedPromptEngine
+from midjourney.adapters.prompts.prompt_engine import OpenAIPromptEngine
+from midjourney.adapters.prompts.template_prompt_engine import TemplatePromptEngine
+from midjourney.domain.i_prompt_engine import PromptEngine
+
+
+class StubEngine(PromptEngine):
+    def __init__(self, result="a primary prompt --ar 9:16", delay=0.0):
+        self.result = result
+        self.delay = delay
+
+    def generate_prompt(self, category, daily_factors, logger=None):
+        time.sleep(self.delay)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+    def generate_from_description(self, description, logger=None):
+        return self.generate_prompt(description, {}, logger)
+
+
+def _hedged(primary, budget=1.0):
+    return HedgedPromptEngine(primary, StubEngine("a fallback prompt"),
+                              latency_budget=budget)
+
+
+def test_hedge_returns_primary_within_budget():
+    engine = _hedged(StubEngine())
+
+    assert engine.generate_prompt("luck", {}) == "a primary prompt --ar 9:16"
+    assert engine.fallback_count == 0
+
+
+def test_hedge_falls_back_on_failure_string_error_and_timeout():
+    failing = [
+        _hedged(StubEngine("Prompt generation failed: 500")),
+        _hedged(StubEngine(RuntimeError("boom"))),
+        _hedged(StubEngine(delay=0.5), budget=0.05),
+    ]
+    for engine in failing:
+        assert engine.generate_prompt("luck", {}) == "a fallback prompt"
+        assert engine.fallback_count == 1
+
+
+def test_openai_client_gets_request_timeout():
+    engine = OpenAIPromptEngine(api_key="sk-test", timeout=40.0)
+
+    assert engine.client.timeout == 40.0
+
+
+def test_template_prompt_is_deterministic_and_bounded():
+    engine = TemplatePromptEngine()
+    factors = DefaultDailyFactors().get_factors(None)
+
+    prompt = engine.generate_prompt("wealth", factors)
+
+    assert prompt == engine.generate_prompt("wealth", factors)
+    assert prompt.endswith(" --ar 9:16")
+    assert len(prompt) <= TemplatePromptEngine.MAX_LENGTH
+
+
+def test_template_subject_and_style_vary_independently():
+    engine = TemplatePromptEngine()
+    daily = DefaultDailyFactors()
+    combinations = set()
+    for day in range(1, 29):
+        factors = daily.get_factors(datetime(2026, 2, day))
+        prompt = engine.generate_prompt("wealth", factors)
+        subject = prompt.split(", ")[0]
+        style = next(s for s in TemplatePromptEngine.STYLES if s in prompt)
+        combinations.add((subject, style))
+
+    assert len(combinations) > 3
@@ -0,0 +1,108 @@
+import pytest
+
+from midjourney.core.prompt_validator import PromptRejected, PromptValidator
+from midjourney.adapters.prompts.template_prompt_engine import TemplatePromptEngine
+
+
+@pytest.fixture
+def validator():
+    return PromptValidator(max_length=350)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('"A golden tree under the moon." --ar 9:16 --ar 9:16',
+     "A golden tree under the moon --ar 9:16"),
+    ("Prompt: **mystic owl**, glowing.", "mystic owl, glowing --ar 9:16"),
+    ("Here's a prompt: a magical tree --ar 9:16", "a magical tree --ar 9:16"),
+    ("/imagine prompt: a cat --stylize 200", "a cat --stylize 200 --ar 9:16"),
+    ("“a fox --ar 16:9 in the woods --v 6”", "a fox in the woods --v 6 --ar 9:16"),
+    ("A golden tree --v 6 glowing lights --ar 9:16",
+     "A golden tree glowing lights --v 6 --ar 9:16"),
+    ("a floor --tile bright marble --niji 6 --no cars, trees",
+     "a floor bright marble --tile --niji 6 --no cars, trees --ar 9:16"),
+    ("a lantern as an aide --ar 9:16", "a lantern as an aide --ar 9:16"),
+    ("I cannot wait for sunrise, a mystical dawn --ar 9:16",
+     "I cannot wait for sunrise, a mystical dawn --ar 9:16"),
+])
+def test_generated_prompt_repairs(validator, raw, expected):
+    assert validator.validate(raw) == expected
+
+
+@pytest.mark.parametrize("raw, reason", [
+    ("Prompt generation failed: 500", "error_or_refusal"),
+    ("I'm sorry, but I can't create that image.", "error_or_refusal"),
+    ("Sure, here is the prompt: I cannot help with that request.", "error_or_refusal"),
+    ("   ", "empty"),
+    (None, "empty"),
+    ('"" --ar 9:16', "empty"),
+])
+def test_generated_prompt_rejections(validator, raw, reason):
+    with pytest.raises(PromptRejected) as info:
+        validator.validate(raw)
+
+    assert info.value.reason == reason
+    assert validator.report() == {f"rejected:{reason}": 1}
+
+
+def test_long_generated_prompt_is_cut_at_a_word(validator):
+    prompt = validator.validate("golden " * 80 + "--ar 9:16")
+
+    assert len(prompt) <= 350
+    assert prompt.endswith("golden --ar 9:16")
+    assert validator.report()["truncated"] == 1
+
+
+def test_user_prompt_keeps_ratio_length_and_wording(validator):
+    long_text = "a lantern " * 50
+
+    assert validator.validate("a cat --ar 16:9", generated=False) == "a cat --ar 16:9"
+    assert validator.validate(long_text, generated=False) == long_text.strip() + " --ar 9:16"
+    assert validator.validate("I'm sorry card, tarot art", generated=False) == (
+        "I'm sorry card, tarot art --ar 9:16"
+    )
+    with pytest.raises(PromptRejected):
+        validator.validate("x " * 4000, generated=False)
+
+
+def test_template_prompts_pass_unchanged(validator):
+    engine = TemplatePromptEngine()
+    factors = {"date": "2026-01-01", "luckyColors": ["Gold"], "luckyNumbers": [3],
+               "lunarPhase": "Full Moon", "season": "Winter", "timeOfDay": "Dawn",
+               "element": "Fire", "planetaryInfluence": "Sun"}
+
+    prompt = engine.generate_prompt("wealth", factors)
+
+    assert validator.validate(prompt) == prompt
+    assert validator.report() == {"accepted": 1}
+
+
+class ScriptedPromptEngine(TemplatePromptEngine):
+    def __init__(self, outputs):
+        super().__init__()
+        self.outputs = list(outputs)
+
+    def generate_prompt(self, category, daily_factors, logger=None):
+        return self.outputs.pop(0)
+
+
+def test_rejected_prompt_is_regenerated(make_generator, container):
+    container.promptEngine = ScriptedPromptEngine([
+        "Prompt generation failed: timeout", "a lucky koi --ar 9:16",
+    ])
+    generator = make_generator()
+
+    jobs = generator.message_push(date="2026-01-01", category="luck")
+
+    assert [job.prompt for job in jobs] == ["a lucky koi --ar 9:16"]
+    assert generator.prompt_validator.report() == {
+        "rejected:error_or_refusal": 1, "accepted": 1,
+    }
+
+
+def test_prompt_is_dropped_after_regeneration_attempts(make_generator, container):
+    container.promptEngine = ScriptedPromptEngine([""] * 3)
+    generator = make_generator()
+
+    assert generator.message_push(date="2026-01-01", category="luck") == []
+    assert generator.message_queue.empty()
+    assert generator.prompt_validator.report() == {"rejected:empty": 3}
@@ -0,0 +1,70 @@
+import pytest
+
+from midjourney.core.job import Job
+from midjourney.core.retry import RetryPolicy
+from midjourney.adapters.discord.discord_engine import (
+    DiscordRateLimited,
+    StageFailed,
+)
+
+
+def test_retry_policy_backoff_is_exponential_and_capped():
+    policy = RetryPolicy(max_attempts=5, backoff=10, multiplier=2, max_delay=35)
+
+    assert [policy.delay(n) for n in (1, 2, 3, 4)] == [10, 20, 35, 35]
+    assert policy.should_retry(4)
+    assert not policy.should_retry(5)
+
+
+def test_retry_policy_honours_retry_after():
+    policy = RetryPolicy(max_attempts=2, backoff=5, max_delay=300)
+
+    assert policy.delay(1, retry_after=42) == 42
+    assert policy.delay(1, retry_after=1000) == 300
+
+
+def test_wait_before_retry_sleeps_then_gives_up(make_generator, clock):
+    generator = make_generator()
+    job = Job({"prompt": "a tree --ar 9:16"})
+    error = StageFailed("send", RuntimeError("500"))
+
+    # send policy: 2 attempts, 5s backoff
+    generator._wait_before_retry("sim1", job, error)
+    assert clock.now() == 5
+    with pytest.raises(StageFailed):
+        generator._wait_before_retry("sim1", job, error)
+
+    assert job.attempts == {"send": 2}
+    assert clock.now() == 5
+
+
+def test_wait_before_retry_waits_out_rate_limit(make_generator, clock):
+    generator = make_generator()
+    job = Job({"prompt": "a tree --ar 9:16"})
+    error = StageFailed("download", DiscordRateLimited("429", retry_after=60))
+
+    generator._wait_before_retry("sim1", job, error)
+
+    assert clock.now() == 60
+
+
+def test_failed_upscale_click_resumes_without_resending(make_generator):
+    generator = make_generator()
+    engine = generator.engines["sim1"][0]
+    job = Job({"prompt": "a tree --ar 9:16"})
+    engine.click_failure_rate = 1.0
+
+    with pytest.raises(StageFailed) as info:
+        engine.generate_image(job.prompt, job.checkpoint)
+    assert info.value.stage == "upscale_click"
+    assert job.checkpoint["stage"] == "grid"
+    grid_message_id = job.checkpoint["message_id"]
+
+    engine.click_failure_rate = 0.0
+    path = generator._generate_with_retries("sim1", engine, job)
+
+    assert path.startswith("simulated/")
+    assert job.checkpoint["message_id"] == grid_message_id
+    assert job.checkpoint["stage"] == "download"
+    # One /imagine, two clicks; the failed click did not resend the prompt
+    assert engine.interactions == 3
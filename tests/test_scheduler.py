@@ -0,0 +1,100 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from midjourney.core.scheduler import BatchScheduler
+
+
+class FakeTime:
+    def __init__(self, start: datetime):
+        self.current = start
+
+    def now(self) -> datetime:
+        return self.current
+
+    def sleep(self, seconds: float) -> None:
+        self.current += timedelta(seconds=seconds)
+
+
+class RecordingGenerator:
+    permutation_max_jobs = 4
+
+    def __init__(self, fake_time, logger):
+        self.fake_time = fake_time
+        self.logger = logger
+        self.calls = []
+
+    def build_messages(self, **kwargs):
+        self.calls.append(("build", self.fake_time.now(), kwargs))
+        return [{"prompt": "a lucky koi --ar 9:16"}]
+
+    def enqueue_messages(self, messages, **kwargs):
+        self.calls.append(("enqueue", self.fake_time.now(), kwargs))
+        return ["job"] * len(messages)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("dawn", time(5, 0)),
+    (" Morning ", time(7, 0)),
+    ("NIGHT", time(20, 0)),
+    ("07:30", time(7, 30)),
+])
+def test_parse_run_time(value, expected):
+    assert BatchScheduler.parse_run_time(value) == expected
+
+
+@pytest.mark.parametrize("value", ["25:00", "lunch", "7", ""])
+def test_parse_run_time_rejects_bad_input(value):
+    with pytest.raises(ValueError):
+        BatchScheduler.parse_run_time(value)
+
+
+def test_next_run_is_strictly_after_and_wraps_to_next_day(container):
+    scheduler = BatchScheduler(RecordingGenerator(None, container.logger),
+                               ["20:00", "07:00"])
+
+    assert scheduler.next_run(datetime(2026, 1, 1, 6, 0)) == datetime(2026, 1, 1, 7, 0)
+    assert scheduler.next_run(datetime(2026, 1, 1, 7, 0)) == datetime(2026, 1, 1, 20, 0)
+    assert scheduler.next_run(datetime(2026, 1, 1, 21, 0)) == datetime(2026, 1, 2, 7, 0)
+
+
+def test_run_prepares_ahead_and_enqueues_at_target(container):
+    fake_time = FakeTime(datetime(2026, 1, 1, 6, 0))
+    generator = RecordingGenerator(fake_time, container.logger)
+    batches = []
+    scheduler = BatchScheduler(
+        generator, ["07:00"], lookahead=timedelta(minutes=30),
+        on_batch=batches.append, pack=True,
+        now=fake_time.now, sleep=fake_time.sleep,
+    )
+
+    scheduler.run(max_runs=1)
+
+    target = datetime(2026, 1, 1, 7, 0)
+    assert generator.calls == [
+        ("build", datetime(2026, 1, 1, 6, 30),
+         {"date": target, "category": None, "dedupe": True}),
+        ("enqueue", target, {"dedupe": True, "pack_size": 4}),
+    ]
+    assert batches == [["job"]]
+
+
+def test_stop_interrupts_the_wait(container):
+    fake_time = FakeTime(datetime(2026, 1, 1, 6, 0))
+    generator = RecordingGenerator(fake_time, container.logger)
+    scheduler = BatchScheduler(generator, ["07:00"], now=fake_time.now,
+                               sleep=lambda seconds: scheduler.stop())
+
+    scheduler.run()
+
+    assert generator.calls == []
+
+
+def test_scheduler_packs_only_the_all_categories_batch(container):
+    generator = RecordingGenerator(None, container.logger)
+
+    packed = BatchScheduler(generator, ["07:00"], pack=True)
+    single = BatchScheduler(generator, ["07:00"], category="luck", pack=True)
+
+    assert packed.pack_size == generator.permutation_max_jobs
+    assert single.pack_size == 0
@@ -0,0 +1,44 @@
+import json
+
+from midjourney.core.simulation import run_simulation
+
+
+def test_simulation_accounts_for_every_job(container):
+    report = run_simulation(num_jobs=44, pack=True, seed=0,
+                            prompt_options={"failure_rate": 0.05})
+
+    assert 0 < report["prompt_failures"] < 4
+    assert report["jobs_enqueued"] + report["jobs_dropped"] == 44
+    assert report["jobs_dropped"] == 11 * report["prompt_failures"]
+    assert report["succeeded"] + report["failed"] == report["jobs_enqueued"]
+
+
+def test_simulation_without_failures_completes_all_jobs(container):
+    failure_free = {key: 0.0 for key in (
+        "send_failure_rate", "grid_lost_rate", "click_failure_rate",
+        "upscale_lost_rate", "download_failure_rate",
+    )}
+
+    report = run_simulation(num_jobs=20, num_channels=2, num_workers=3,
+                            engine_options=failure_free,
+                            prompt_options={"failure_rate": 0.0})
+
+    assert report["succeeded"] == 20
+    assert report["retries"] == 0
+    assert report["virtual_makespan_s"] > 0
+
+
+def test_injected_engines_trace_their_stages(make_generator, tmp_path):
+    trace_path = tmp_path / "trace.json"
+    generator = make_generator(num_workers=1, trace_file=str(trace_path))
+
+    job = generator.message_push(user_prompt="a golden owl --ar 9:16")[0]
+    job.result(timeout=30)
+    generator.tracer.save()
+
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    assert {"job", "send", "grid", "poll_grid", "upscale", "download"} <= set(spans)
+    # Durations are in virtual microseconds; each poll waits 30s
+    assert spans["grid"]["dur"] >= 30_000_000
+    assert spans["job"]["dur"] >= spans["grid"]["dur"] + spans["upscale"]["dur"]
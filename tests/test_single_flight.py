@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from midjourney.adapters.prompts.template_prompt_engine import TemplatePromptEngine
+
+
+class CountingPromptEngine(TemplatePromptEngine):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def generate_prompt(self, category, daily_factors, logger=None):
+        self.calls += 1
+        return super().generate_prompt(category, daily_factors, logger)
+
+
+@pytest.fixture
+def prompt_engine(container):
+    container.promptEngine = CountingPromptEngine()
+    return container.promptEngine
+
+
+def test_duplicate_daily_push_coalesces_without_generating(make_generator, prompt_engine):
+    generator = make_generator()
+
+    first = generator.message_push(date="2026-01-01", category="Tarot")
+    second = generator.message_push(date="2026-01-01", category="Tarot")
+
+    assert second == first
+    assert prompt_engine.calls == 1
+    assert generator.message_queue.qsize() == 1
+
+
+def test_no_dedupe_generates_and_enqueues_again(make_generator, prompt_engine):
+    generator = make_generator()
+
+    first = generator.message_push(date="2026-01-01", category="Tarot", dedupe=False)
+    second = generator.message_push(date="2026-01-01", category="Tarot", dedupe=False)
+
+    assert first[0] is not second[0]
+    assert prompt_engine.calls == 2
+    assert generator.message_queue.qsize() == 2
+
+
+def test_scheduled_runs_on_the_same_day_are_separate_batches(make_generator):
+    generator = make_generator()
+
+    morning = generator.message_push(date=datetime(2026, 1, 1, 7, 0), category="Tarot")
+    later = generator.message_push(date=datetime(2026, 1, 1, 7, 30), category="Tarot")
+
+    assert morning[0] is not later[0]
+
+
+def test_finished_job_is_not_reused(make_generator, prompt_engine):
+    generator = make_generator()
+    first = generator.message_push(date="2026-01-01", category="Tarot")[0]
+    first.future.set_result({"job_id": first.job_id})
+
+    second = generator.message_push(date="2026-01-01", category="Tarot")[0]
+
+    assert second is not first
+    assert prompt_engine.calls == 2
+
+
+def test_user_prompts_coalesce_on_normalized_text(make_generator):
+    generator = make_generator()
+
+    first = generator.message_push(user_prompt="A golden owl --ar 9:16")
+    second = generator.message_push(user_prompt='  "a golden  owl." --ar 9:16')
+
+    assert second == first
@@ -0,0 +1,50 @@
+import atexit
+import json
+
+from midjourney.utils.clock.virtual_clock import VirtualClock
+from midjourney.utils.tracing.tracer import Tracer
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    tracer = Tracer()
+
+    with tracer.span("job"):
+        pass
+    tracer.save()
+
+    assert tracer._events == []
+
+
+def test_spans_use_the_given_clock(tmp_path):
+    clock = VirtualClock()
+    tracer = Tracer(str(tmp_path / "trace.json"), clock=clock)
+
+    with tracer.span("grid", attempt=1):
+        clock.sleep(2.5)
+    tracer.save()
+    tracer.close()
+
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    span = next(e for e in events if e["ph"] == "X")
+    assert (span["name"], span["ts"], span["dur"]) == ("grid", 0, 2_500_000)
+    assert span["args"] == {"attempt": 1}
+
+
+def test_trace_file_replaces_container_tracer(make_generator, container,
+                                             tmp_path, monkeypatch):
+    configured = Tracer(str(tmp_path / "configured.json"))
+    container.tracer = configured
+    unregistered = []
+    real_unregister = atexit.unregister
+    monkeypatch.setattr(atexit, "unregister", lambda fn: (
+        unregistered.append(fn), real_unregister(fn)
+    ))
+
+    generator = make_generator(trace_file=str(tmp_path / "cli.json"))
+
+    assert generator.tracer is container.tracer is not configured
+    assert not configured.enabled
+    assert unregistered == [configured.save]
+    generator.tracer.close()
+    configured.save()
+    assert not (tmp_path / "configured.json").exists()
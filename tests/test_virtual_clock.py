@@ -0,0 +1,72 @@
+import threading
+from queue import Empty, Queue
+
+import pytest
+
+from midjourney.utils.clock.virtual_clock import VirtualClock
+
+
+def test_unregistered_sleep_advances_immediately():
+    clock = VirtualClock(start=100.0)
+
+    clock.sleep(3600)
+
+    assert clock.now() == 3700.0
+
+
+def test_registered_threads_wake_in_deadline_order():
+    clock = VirtualClock()
+    woke = []
+    ready = threading.Barrier(4)
+
+    def worker(delay):
+        clock.register()
+        ready.wait()
+        try:
+            clock.sleep(delay)
+            woke.append((delay, clock.now()))
+        finally:
+            clock.unregister()
+
+    threads = [threading.Thread(target=worker, args=(d,)) for d in (30, 10, 20)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert sorted(woke) == [(10, 10.0), (20, 20.0), (30, 30.0)]
+
+
+def test_busy_registered_thread_holds_time():
+    clock = VirtualClock()
+    clock.register()
+    slept = threading.Event()
+
+    def sleeper():
+        clock.sleep(50)
+        slept.set()
+
+    thread = threading.Thread(target=sleeper)
+    thread.start()
+    # This registered thread is busy, so virtual time cannot move
+    assert not slept.wait(0.1)
+    assert clock.now() == 0.0
+
+    clock.unregister()
+    thread.join(timeout=5)
+    assert slept.is_set()
+    assert clock.now() == 50.0
+
+
+def test_queue_get_waits_in_virtual_time():
+    clock = VirtualClock()
+    queue = Queue()
+
+    with pytest.raises(Empty):
+        clock.queue_get(queue, timeout=1)
+    assert clock.now() == 1.0
+
+    queue.put("job")
+    assert clock.queue_get(queue, timeout=1) == "job"
+    assert clock.now() == 1.0